@@ -0,0 +1,154 @@
+import os
+import threading
+
+import pandas as pd
+
+AGG_COLUMNS = ["Kỳ", "Khoá", "Buổi", "Số buổi", "Tổng điểm"]
+
+# Số dòng cộng dồn trong aggregates.delta.csv trước khi gộp lại vào aggregates.csv
+COMPACT_EVERY = 200
+
+
+def week_key(day):
+    year, week, _ = pd.Timestamp(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+def month_key(day):
+    day = pd.Timestamp(day)
+    return f"{day.year}-{day.month:02d}"
+
+
+class AggregateTable:
+    # Bảng tổng hợp theo tuần ISO (năm-tuần) và theo tháng, tách theo loại buổi.
+    # aggregates.csv là bản đã gộp; mỗi lần lưu một buổi chỉ ghi thêm phần cộng dồn của các ô bị ảnh hưởng
+    # vào aggregates.delta.csv, đủ dài thì gộp lại khi load.
+
+    def __init__(self, path="aggregates.csv", source="data.csv", compact_every=COMPACT_EVERY):
+        self.path = path
+        self.delta_path = path.replace(".csv", "") + ".delta.csv"
+        self.source = source
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._cells = {}
+        self._pending = 0
+        self._source_sig = None
+        with self._lock:
+            if self._stale_on_disk():
+                self._rebuild(self._read_source())
+            else:
+                self._load()
+
+    def source_signature(self):
+        # gọi ngay trước khi ghi data.csv, truyền lại cho add_run
+        return self._signature()
+
+    def _signature(self):
+        try:
+            st = os.stat(self.source)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _stale_on_disk(self):
+        # data.csv sửa sau lần ghi bảng tổng hợp cuối cùng (kể cả từ process khác) -> tính lại
+        if not os.path.exists(self.path):
+            return True
+        written = max(os.path.getmtime(p) for p in (self.path, self.delta_path) if os.path.exists(p))
+        return os.path.exists(self.source) and os.path.getmtime(self.source) > written
+
+    def _refresh(self):
+        # data.csv bị sửa ngoài app trong lúc process đang chạy -> dựng lại thay vì giữ số cũ
+        if self._signature() != self._source_sig:
+            self._rebuild(self._read_source())
+
+    def _load(self):
+        cells = {}
+        frames = [pd.read_csv(self.path)]
+        if os.path.exists(self.delta_path):
+            frames.append(pd.read_csv(self.delta_path))
+        for table in frames:
+            for r in table.itertuples(index=False):
+                cell = cells.setdefault((r[0], r[1], r[2]), [0, 0.0])
+                cell[0] += int(r[3])
+                cell[1] += float(r[4])
+        self._cells = cells
+        self._pending = len(frames[1]) if len(frames) > 1 else 0
+        self._source_sig = self._signature()
+        if self._pending >= self.compact_every:
+            self._compact()
+
+    def _read_source(self):
+        try:
+            df = pd.read_csv(self.source)
+            df["Ngày"] = pd.to_datetime(df["Ngày"])
+            return df
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return pd.DataFrame(columns=["Ngày", "Buổi", "Tổng điểm"])
+
+    def rebuild(self, df):
+        with self._lock:
+            self._rebuild(df)
+
+    def _rebuild(self, df):
+        df = df.dropna(subset=["Ngày"])
+        cells = {}
+        if not df.empty:
+            days = pd.to_datetime(df["Ngày"])
+            iso = days.dt.isocalendar()
+            keys = {
+                "tuần": iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2),
+                "tháng": days.dt.strftime("%Y-%m"),
+            }
+            for period, key in keys.items():
+                grouped = pd.DataFrame({"Khoá": key, "Buổi": df["Buổi"], "Tổng điểm": df["Tổng điểm"]}) \
+                    .groupby(["Khoá", "Buổi"])["Tổng điểm"].agg(["count", "sum"])
+                for (k, buoi), r in grouped.iterrows():
+                    cells[(period, k, buoi)] = [int(r["count"]), float(r["sum"])]
+        self._cells = cells
+        self._compact()
+        self._source_sig = self._signature()
+
+    def add_run(self, day, buoi, score, before=None):
+        # gọi ngay sau khi buổi này được ghi vào data.csv: chỉ hai ô (tuần, tháng) đổi, ghi thêm hai dòng.
+        # before: source_signature() lấy ngay trước lần ghi đó; khác lần đồng bộ cuối nghĩa là data.csv còn bị sửa
+        # ngoài app -> dựng lại từ file (đã có cả buổi mới), không cộng thêm lần nữa
+        with self._lock:
+            if before is not None and before != self._source_sig:
+                self._rebuild(self._read_source())
+                return
+            delta = [(period, key, buoi, 1, float(score)) for period, key in (("tuần", week_key(day)), ("tháng", month_key(day)))]
+            for period, key, b, count, total in delta:
+                cell = self._cells.setdefault((period, key, b), [0, 0.0])
+                cell[0] += count
+                cell[1] += total
+            new_file = not os.path.exists(self.delta_path)
+            pd.DataFrame(delta, columns=AGG_COLUMNS).to_csv(self.delta_path, mode="a", header=new_file, index=False)
+            self._pending += len(delta)
+            # lần ghi data.csv vừa rồi đã được tính vào bảng
+            self._source_sig = self._signature()
+            if self._pending >= self.compact_every:
+                self._compact()
+
+    def _compact(self):
+        tmp_path = self.path + ".tmp"
+        self._frame().to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.delta_path):
+            os.remove(self.delta_path)
+        self._pending = 0
+
+    def _frame(self):
+        return pd.DataFrame(
+            [(p, k, b, c, s) for (p, k, b), (c, s) in self._cells.items()],
+            columns=AGG_COLUMNS,
+        )
+
+    def summary(self, period="tuần", by_type=False):
+        with self._lock:
+            self._refresh()
+            table = self._frame()
+        table = table[table["Kỳ"] == period]
+        keys = ["Khoá", "Buổi"] if by_type else ["Khoá"]
+        out = table.groupby(keys, as_index=False)[["Số buổi", "Tổng điểm"]].sum().sort_values(keys)
+        out["Điểm TB"] = out["Tổng điểm"] / out["Số buổi"]
+        return out.reset_index(drop=True)
@@ -4,6 +4,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import date
 
+from aggregates import AggregateTable
+from schedule_index import load_schedule
+
 @st.cache_data
 def load_data():
     try:
@@ -26,24 +29,31 @@ def rate(score):
     elif score >= 60: return "Trung bình"
     else: return "Cần điều chỉnh"
 
+@st.cache_resource
+def get_aggregates():
+    return AggregateTable("aggregates.csv", source="data.csv")
+
 df = load_data()
 
 st.title("🏃‍♂️ Running Coach Tien")
 tab1, tab2, tab3 = st.tabs(["📅 Hôm nay tập gì", "📝 Nhật ký chạy", "📊 Biểu đồ"])
 
 with tab1:
-    today = pd.to_datetime(date.today())
+    today = date.today()
     try:
-        schedule = pd.read_csv("schedule.csv")
-        schedule["Ngày"] = pd.to_datetime(schedule["Ngày"])
-        today_plan = schedule[schedule["Ngày"] == today]
-        if not today_plan.empty:
+        schedule = load_schedule("schedule.csv")
+    except FileNotFoundError:
+        st.warning("Không tìm thấy file lịch tập.")
+    else:
+        today_plan = schedule.on(today)
+        if today_plan is not None:
             st.subheader("Lịch tập hôm nay:")
-            st.write(today_plan.iloc[0][["Buổi", "Nội dung", "Target HR Zone"]])
+            st.write(today_plan[["Buổi", "Nội dung", "Target HR Zone"]])
         else:
             st.info("Hôm nay không có buổi chạy.")
-    except:
-        st.warning("Không tìm thấy file lịch tập.")
+            next_plan = schedule.next_session(today)
+            if next_plan is not None:
+                st.write(f"Buổi kế tiếp: **{next_plan['Buổi']}** ngày {next_plan['Ngày']:%d/%m/%Y} – {next_plan['Nội dung']}")
 
 with tab2:
     st.subheader("Nhập kết quả buổi chạy")
@@ -73,17 +83,18 @@ with tab2:
             new_row["Tổng điểm"] = calculate_score(new_row)
             new_row["Đánh giá"] = rate(new_row["Tổng điểm"])
             df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+            before = get_aggregates().source_signature()
             df.to_csv("data.csv", index=False)
+            get_aggregates().add_run(new_row["Ngày"], session, new_row["Tổng điểm"], before)
             st.success("Đã lưu kết quả!")
 
     st.dataframe(df.sort_values("Ngày", ascending=False))
 
 with tab3:
-    if not df.empty:
-        df["Tuần"] = df["Ngày"].dt.isocalendar().week
-        weekly = df.groupby("Tuần")["Tổng điểm"].mean().reset_index()
+    weekly = get_aggregates().summary("tuần")
+    if not weekly.empty:
         fig, ax = plt.subplots()
-        ax.bar(weekly["Tuần"], weekly["Tổng điểm"], color='skyblue')
+        ax.bar(weekly["Khoá"], weekly["Điểm TB"], color='skyblue')
         ax.axhline(80, color='green', linestyle='--', label="Tốt")
         ax.axhline(60, color='orange', linestyle='--', label="Trung bình")
         ax.set_ylabel("Tổng điểm")
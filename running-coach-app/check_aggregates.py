@@ -0,0 +1,61 @@
+# Kiểm tra bảng tổng hợp theo đúng trình tự lưu của app.py: lấy chữ ký data.csv -> ghi data.csv -> add_run.
+#  - lưu hai buổi trong cùng tuần: phải ra 2 buổi / 140 điểm, mỗi lần lưu chỉ ghi thêm vào aggregates.delta.csv
+#  - data.csv bị sửa ngoài app giữa hai lần lưu: dựng lại từ file, không đếm trùng buổi mới
+#   python check_aggregates.py
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aggregates import AggregateTable  # noqa: E402
+
+
+def save(table, df, day, buoi, score):
+    # giống nút "Lưu kết quả" trong app.py
+    df = pd.concat([df, pd.DataFrame([{"Ngày": pd.Timestamp(day), "Buổi": buoi, "Tổng điểm": score}])], ignore_index=True)
+    before = table.source_signature()
+    df.to_csv(table.source, index=False)
+    table.add_run(pd.Timestamp(day), buoi, score, before)
+    return df
+
+
+def week(table, key):
+    row = table.summary("tuần").set_index("Khoá").loc[key]
+    return int(row["Số buổi"]), float(row["Tổng điểm"])
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        source, path = os.path.join(workdir, "data.csv"), os.path.join(workdir, "aggregates.csv")
+        table = AggregateTable(path, source=source)
+        compacted = os.path.getmtime(path)
+        df = save(table, pd.DataFrame(columns=["Ngày", "Buổi", "Tổng điểm"]), "2025-01-06", "Tempo", 60)
+        if week(table, "2025-W02") != (1, 60.0):
+            failures.append(f"sau lần lưu 1: {week(table, '2025-W02')}, cần (1, 60.0)")
+        df = save(table, df, "2025-01-08", "Interval", 80)
+        if week(table, "2025-W02") != (2, 140.0):
+            failures.append(f"sau lần lưu 2: {week(table, '2025-W02')}, cần (2, 140.0)")
+        if os.path.getmtime(path) != compacted or not os.path.exists(table.delta_path):
+            failures.append("lưu một buổi đã ghi lại cả aggregates.csv thay vì ghi thêm vào delta")
+        if week(AggregateTable(path, source=source), "2025-W02") != (2, 140.0):
+            failures.append("mở lại từ aggregates.csv + delta không ra đúng số")
+
+        # sửa data.csv ngoài app (xoá buổi đầu) rồi lưu tiếp
+        df = df.iloc[1:]
+        df.to_csv(source, index=False)
+        save(table, df, "2025-01-09", "Long run", 90)
+        if week(table, "2025-W02") != (2, 170.0):
+            failures.append(f"sau khi sửa ngoài app: {week(table, '2025-W02')}, cần (2, 170.0)")
+
+    for failure in failures:
+        print("LỖI:", failure)
+    print("aggregates: ok" if not failures else f"aggregates: {len(failures)} lỗi")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class ScheduleIndex:
+    # Lịch tập sắp theo ngày: tra "hôm nay" bằng dict, "buổi kế tiếp"/"khoảng ngày" bằng tìm nhị phân.
+
+    def __init__(self, schedule):
+        schedule = schedule.assign(Ngày=pd.to_datetime(schedule["Ngày"]).dt.normalize())
+        self.frame = schedule.sort_values("Ngày", kind="stable").reset_index(drop=True)
+        self._days = self.frame["Ngày"].to_numpy(dtype="datetime64[D]")
+        self._by_day = {}
+        for i, day in enumerate(self._days.tolist()):
+            self._by_day.setdefault(day, i)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def on(self, day):
+        i = self._by_day.get(pd.Timestamp(day).date())
+        return None if i is None else self.frame.iloc[i]
+
+    def next_session(self, day):
+        # buổi đầu tiên từ ngày day trở đi
+        i = np.searchsorted(self._days, np.datetime64(pd.Timestamp(day).date(), "D"), side="left")
+        return None if i >= len(self._days) else self.frame.iloc[i]
+
+    def between(self, start, end):
+        lo = np.searchsorted(self._days, np.datetime64(pd.Timestamp(start).date(), "D"), side="left")
+        hi = np.searchsorted(self._days, np.datetime64(pd.Timestamp(end).date(), "D"), side="right")
+        return self.frame.iloc[lo:hi]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def load_schedule(path="schedule.csv"):
+    # Mỗi file lịch chỉ được đọc lại khi mtime/kích thước đổi; giữ riêng cho từng đường dẫn
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _indexes.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    index = ScheduleIndex(pd.read_csv(path))
+    with _lock:
+        _indexes[path] = (signature, index)
+    return index
@@ -0,0 +1,179 @@
+import math
+import os
+import xml.etree.ElementTree as ET
+from array import array
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# Đọc file hoạt động từ đồng hồ (GPX, TCX, FIT) theo luồng: từng điểm được xử lý rồi bỏ khỏi cây XML,
+# nên buổi chạy nhiều giờ vẫn không dựng cả cây trong bộ nhớ.
+
+FORMATS = {".gpx": "gpx", ".tcx": "tcx", ".fit": "fit"}
+
+EARTH_RADIUS_M = 6_371_000
+
+# pace theo giây tính trên quãng ±15 mẫu cho đỡ nhiễu GPS
+PACE_WINDOW = 15
+
+# Giờ trong file là UTC ("Z"); ngày chạy lấy theo giờ địa phương: RUNNING_COACH_TZ=Asia/Ho_Chi_Minh, mặc định giờ của máy
+LOCAL_TZ = ZoneInfo(os.environ["RUNNING_COACH_TZ"]) if os.environ.get("RUNNING_COACH_TZ") else None
+
+
+@lru_cache(maxsize=256)
+def _local(tag):
+    # "{namespace}hr" -> "hr"; mỗi file chỉ có vài chục tên thẻ nên cache lại
+    return tag.rsplit("}", 1)[-1]
+
+def _elements(source, name):
+    # iterparse nhưng xoá mỗi phần tử <name> khỏi cha ngay sau khi dùng xong
+    parents = []
+    suffix = "}" + name
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag == name or elem.tag.endswith(suffix):
+            yield elem
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+
+def _children(elem):
+    return {_local(child.tag): child.text for child in elem.iter()}
+
+def _time(text):
+    return datetime.fromisoformat(text.strip().replace("Z", "+00:00")) if text else None
+
+def _number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _haversine(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class _Track:
+    # cộng dồn quãng đường từ toạ độ khi file không ghi sẵn cự ly
+    def __init__(self):
+        self.position = None
+        self.distance = 0.0
+
+    def advance(self, lat, lon):
+        if math.isnan(lat) or math.isnan(lon):
+            return self.distance
+        if self.position is not None:
+            self.distance += _haversine(*self.position, lat, lon)
+        self.position = (lat, lon)
+        return self.distance
+
+
+def gpx_points(source):
+    track = _Track()
+    for point in _elements(source, "trkpt"):
+        values = _children(point)
+        distance = track.advance(_number(point.get("lat")), _number(point.get("lon")))
+        yield _time(values.get("time")), _number(values.get("hr")), distance, math.nan
+
+def tcx_points(source):
+    track = _Track()
+    for point in _elements(source, "Trackpoint"):
+        values = _children(point)
+        distance = _number(values.get("DistanceMeters"))
+        if math.isnan(distance):
+            distance = track.advance(_number(values.get("LatitudeDegrees")), _number(values.get("LongitudeDegrees")))
+        # HR nằm trong <HeartRateBpm><Value>
+        yield _time(values.get("Time")), _number(values.get("Value")), distance, math.nan
+
+def fit_points(source):
+    # FIT là file nhị phân: cần thư viện fitdecode (không bắt buộc, chỉ khi nhập file .fit)
+    try:
+        import fitdecode
+    except ImportError:
+        raise ImportError("Cần cài fitdecode để đọc file .fit: pip install fitdecode") from None
+    with fitdecode.FitReader(source) as fit:
+        for frame in fit:
+            if frame.frame_type != fitdecode.FIT_FRAME_DATA or frame.name != "record":
+                continue
+            values = [frame.get_value(name, fallback=None) for name in ("timestamp", "heart_rate", "distance", "saturated_hemoglobin_percent")]
+            yield values[0], *(math.nan if v is None else float(v) for v in values[1:])
+
+READERS = {"gpx": gpx_points, "tcx": tcx_points, "fit": fit_points}
+
+
+def detect_format(name):
+    fmt = FORMATS.get(os.path.splitext(str(name))[1].lower())
+    if fmt is None:
+        raise ValueError(f"Không nhận dạng được định dạng file: {name}")
+    return fmt
+
+
+def local_day(stamp, tz=LOCAL_TZ):
+    # chạy 6h sáng giờ Việt Nam là 23h hôm trước theo UTC; giờ không kèm múi (naive) coi như đã là giờ địa phương
+    if stamp.tzinfo is not None:
+        stamp = stamp.astimezone(tz)
+    return stamp.date().isoformat()
+
+
+def read_activity(source, fmt=None):
+    # source: đường dẫn hoặc file object (file tải lên). Trả về (tóm tắt buổi chạy, các kênh theo giây cho StreamStore).
+    # Tóm tắt cộng dồn từng điểm; mẫu theo giây giữ trong array gọn (vài byte mỗi điểm)
+    fmt = fmt or detect_format(getattr(source, "name", source))
+    start = None
+    seconds, hrs, distances, spo2s = array("i"), array("f"), array("f"), array("f")
+    hr_weighted = hr_time = 0.0
+    for stamp, hr, distance, spo2 in READERS[fmt](source):
+        if stamp is None:
+            continue
+        start = start or stamp
+        t = int((stamp - start).total_seconds())
+        if seconds and t <= seconds[-1]:
+            continue
+        if seconds and not math.isnan(hrs[-1]):
+            # HR trung bình theo thời gian, không theo số điểm (đồng hồ ghi thưa khi chạy đều)
+            hr_weighted += hrs[-1] * (t - seconds[-1])
+            hr_time += t - seconds[-1]
+        seconds.append(t)
+        hrs.append(hr)
+        distances.append(distance)
+        spo2s.append(spo2)
+    if not seconds:
+        raise ValueError("File không có điểm nào có thời gian")
+
+    t = np.frombuffer(seconds, dtype=np.int32)
+    distance = np.frombuffer(distances, dtype=np.float32).astype(float)
+    spo2 = np.frombuffer(spo2s, dtype=np.float32)
+    measured = spo2[~np.isnan(spo2)]
+    duration = int(t[-1])
+    total = float(np.nanmax(distance)) if not np.isnan(distance).all() else math.nan
+    summary = {
+        "Ngày chạy": local_day(start),
+        "Pace": duration / 60 / (total / 1000) if total > 0 else math.nan,
+        "HR": round(hr_weighted / hr_time) if hr_time else math.nan,
+        "Thời gian (phút)": round(duration / 60),
+        "Cự ly (m)": total,
+        # vài đồng hồ có đo SpO2: lấy mẫu đầu và cuối buổi
+        "SpO2 trước": float(measured[0]) if len(measured) else math.nan,
+        "SpO2 sau": float(measured[-1]) if len(measured) else math.nan,
+    }
+    samples = {"Giây": t, "HR": np.frombuffer(hrs, dtype=np.float32), "Cự ly (m)": distance.astype(np.float32),
+               "Pace (giây/km)": pace_stream(t, distance)}
+    if len(measured):
+        samples["SpO2"] = spo2
+    return summary, samples
+
+
+def pace_stream(t, distance, window=PACE_WINDOW):
+    # giây/km theo từng mẫu; đứng yên (không tăng cự ly) -> NaN
+    hi = np.minimum(np.arange(len(t)) + window, len(t) - 1)
+    lo = np.maximum(np.arange(len(t)) - window, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moved = distance[hi] - distance[lo]
+        return np.where(moved > 0, (t[hi] - t[lo]) / moved * 1000, np.nan)
@@ -0,0 +1,292 @@
+# HTTP API nhỏ (asyncio, không cần thư viện ngoài) để ghi và tra cứu buổi chạy.
+#   python api.py --port 8765 [--store sqlite|journal|memory]
+#
+#   POST /runs              ghi buổi chạy; thiếu "Buổi" thì lấy buổi chưa nhập đầu tiên
+#   PUT  /sessions/{buổi}   ghi/thay kết quả của một buổi
+#   GET  /history           lịch sử (lọc: ?type=Tempo&from=2025-01-01&to=2025-02-01)
+#   GET  /plan/today        buổi kế tiếp cần tập trong kế hoạch
+#   PUT  /sessions/{buổi}/stream   lưu dữ liệu theo giây: {"Giây": [...], "HR": [...], "Pace (giây/km)": [...], ...}
+#   GET  /sessions/{buổi}/stream   đọc lại (cắt: ?from=600&to=1200 theo giây, ?channels=HR,Giây)
+import argparse
+import asyncio
+import json
+import sys
+import traceback
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from plan import sessions
+from schema import untyped
+from scoring import ZONE_COLUMN, CompiledRules, load_rules, rate
+from storage import ConflictError, athlete_path, open_store
+from streams import CHANNELS, MISSING, open_streams
+from targets import target_index
+from zones import HRProfile, season_zone_percent
+
+INPUT_FIELDS = ["Ngày chạy", "Pace", "HR", "SpO2 trước", "SpO2 sau", "RPE"]
+
+
+class BadRequest(Exception):
+    pass
+
+
+def parse_buoi(value):
+    # "Buổi" trong body phải là số nguyên (3 hoặc "3"), không nhận 3.5 / [3] / "ba"
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdigit():
+        raise BadRequest(f"Buổi không hợp lệ: {value!r}")
+    return int(value)
+
+
+class WriteBatcher:
+    # Gom các lệnh ghi đồng thời thành một lần upsert_many vào store.
+
+    def __init__(self, store, max_batch=256, max_delay=0.005):
+        self.store = store
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.rows = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def write(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await asyncio.to_thread(self.store.upsert_many, [row for row, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+            else:
+                self.batches += 1
+                self.rows += len(batch)
+                for row, future in batch:
+                    future.set_result(row)
+
+
+class RunCoachAPI:
+    def __init__(self, store, rules=None, streams=None, profile=None):
+        self.store = store
+        self.streams = streams
+        self.profile = profile or HRProfile()
+        self.engine = CompiledRules(rules or load_rules(), target_index(hr_edges=self.profile.edges()))
+        self.batcher = WriteBatcher(store)
+        self._reserved = set()
+
+    def _build_row(self, buoi, payload):
+        if not 1 <= buoi <= len(sessions):
+            raise BadRequest(f"Buổi phải trong khoảng 1–{len(sessions)}")
+        missing = [f for f in INPUT_FIELDS if f not in payload]
+        if missing:
+            raise BadRequest("Thiếu trường: " + ", ".join(missing))
+        row = {f: payload[f] for f in INPUT_FIELDS}
+        row["Thời gian (phút)"] = payload.get("Thời gian (phút)")
+        try:
+            for f in ["Pace", "HR", "SpO2 trước", "SpO2 sau", "RPE"]:
+                row[f] = float(row[f])
+            row["Ngày chạy"] = pd.Timestamp(row["Ngày chạy"]).date().isoformat()
+        except (TypeError, ValueError) as exc:
+            raise BadRequest(str(exc))
+        row["Buổi"] = buoi
+        row["Loại buổi"] = sessions[buoi - 1][0]
+        return self._score(row)
+
+    def _score(self, row):
+        # buổi đã có dữ liệu theo giây thì điểm gồm cả % thời gian đúng vùng HR mục tiêu
+        if self.streams is not None and self.streams.version(row["Buổi"]) is not None:
+            percent = season_zone_percent(self.streams, self.profile, self.engine.targets, [row["Buổi"]]).iloc[0]
+            row[ZONE_COLUMN] = None if pd.isna(percent) else round(float(percent), 1)
+        row["Tổng điểm"] = self.engine.score_row(row["Loại buổi"], row)
+        row["Đánh giá"] = rate(row["Tổng điểm"])
+        return row
+
+    async def _next_session(self):
+        # đọc store trong thread: sqlite/CSV lớn không chặn các request khác
+        history = await asyncio.to_thread(self.store.load, ["Buổi"])
+        done = set(pd.to_numeric(history["Buổi"], errors="coerce").dropna().astype(int))
+        done |= self._reserved
+        return next((i for i in range(1, len(sessions) + 1) if i not in done), None)
+
+    async def log_run(self, payload):
+        if payload.get("Buổi") is not None:
+            return HTTPStatus.CREATED, await self.batcher.write(self._build_row(parse_buoi(payload["Buổi"]), payload))
+        buoi = await self._next_session()
+        if buoi is None:
+            raise BadRequest("Đã hoàn thành toàn bộ kế hoạch")
+        # giữ chỗ buổi này cho tới khi ghi xong để các request đồng thời không lấy trùng
+        self._reserved.add(buoi)
+        try:
+            return HTTPStatus.CREATED, await self.batcher.write(self._build_row(buoi, payload))
+        finally:
+            self._reserved.discard(buoi)
+
+    async def upsert_session(self, buoi, payload):
+        return HTTPStatus.OK, await self.batcher.write(self._build_row(buoi, payload))
+
+    def history(self, query):
+        df = self.store.load()
+        days = df["Ngày chạy"]
+        mask = pd.Series(True, index=df.index)
+        if "type" in query:
+            mask &= df["Loại buổi"] == query["type"][0]
+        if "from" in query:
+            mask &= days >= pd.Timestamp(query["from"][0])
+        if "to" in query:
+            mask &= days <= pd.Timestamp(query["to"][0])
+        df = untyped(df[mask].sort_values("Buổi"))
+        return HTTPStatus.OK, json.loads(df.to_json(orient="records", force_ascii=False))
+
+    def _stream_store(self, buoi):
+        if self.streams is None:
+            raise BadRequest("API chạy không kèm nơi lưu dữ liệu theo giây")
+        if not 1 <= buoi <= len(sessions):
+            raise BadRequest(f"Buổi phải trong khoảng 1–{len(sessions)}")
+        return self.streams
+
+    async def save_stream(self, buoi, payload):
+        # ghi hàng nghìn mẫu là việc đĩa, không chặn event loop
+        count = await asyncio.to_thread(self._stream_store(buoi).save, buoi, payload)
+        result = {"Buổi": buoi, "Số mẫu": count}
+        current = await asyncio.to_thread(self.store.get, buoi)
+        if current is not None:
+            # buổi đã nhập kết quả: chấm lại với phần thời gian trong vùng HR
+            row = self._score({**current, "Loại buổi": sessions[buoi - 1][0]})
+            await self.batcher.write(row)
+            result.update({k: row.get(k) for k in [ZONE_COLUMN, "Tổng điểm", "Đánh giá"]})
+        return HTTPStatus.OK, result
+
+    def stream(self, buoi, query):
+        channels = query["channels"][0].split(",") if "channels" in query else None
+        if channels and set(channels) - set(CHANNELS):
+            raise BadRequest("Kênh không hỗ trợ: " + ", ".join(sorted(set(channels) - set(CHANNELS))))
+        start = float(query["from"][0]) if "from" in query else None
+        end = float(query["to"][0]) if "to" in query else None
+        data = self._stream_store(buoi).window(buoi, start, end, channels)
+        if data is None:
+            return HTTPStatus.NOT_FOUND, {"lỗi": f"Buổi #{buoi} chưa có dữ liệu theo giây"}
+        return HTTPStatus.OK, {name: np.where(values == MISSING, None, values).tolist() if values.dtype.kind == "i"
+                               else np.where(np.isnan(values), None, values).tolist() for name, values in data.items()}
+
+    async def today(self):
+        buoi = await self._next_session()
+        if buoi is None:
+            return HTTPStatus.OK, {"Buổi": None, "Ghi chú": "Đã hoàn thành toàn bộ kế hoạch"}
+        buoi_type, content, zone = sessions[buoi - 1]
+        return HTTPStatus.OK, {"Buổi": buoi, "Loại buổi": buoi_type, "Nội dung": content, "Target HR Zone": zone}
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        payload = json.loads(body) if body else {}
+        if not isinstance(payload, dict):
+            raise BadRequest("Body phải là một object JSON")
+        if method == "POST" and parts == ["runs"]:
+            return await self.log_run(payload)
+        if method == "PUT" and len(parts) == 2 and parts[0] == "sessions" and parts[1].isdigit():
+            return await self.upsert_session(int(parts[1]), payload)
+        if len(parts) == 3 and parts[0] == "sessions" and parts[1].isdigit() and parts[2] == "stream":
+            if method == "PUT":
+                return await self.save_stream(int(parts[1]), payload)
+            if method == "GET":
+                # cắt memmap và chuyển sang JSON trong thread, không chặn các request khác
+                return await asyncio.to_thread(self.stream, int(parts[1]), parse_qs(url.query))
+        if method == "GET" and parts == ["history"]:
+            # đọc cả lịch sử (có thể phải đọc lại toàn bộ file) trong thread
+            return await asyncio.to_thread(self.history, parse_qs(url.query))
+        if method == "GET" and parts == ["plan", "today"]:
+            return await self.today()
+        return HTTPStatus.NOT_FOUND, {"lỗi": "Không có endpoint này"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                try:
+                    status, result = await self.dispatch(method, target, body)
+                except (BadRequest, json.JSONDecodeError, ValueError) as exc:
+                    status, result = HTTPStatus.BAD_REQUEST, {"lỗi": str(exc)}
+                except ConflictError as exc:
+                    status, result = HTTPStatus.CONFLICT, {"lỗi": str(exc)}
+                except TimeoutError as exc:
+                    # khoá ghi đang bị giữ quá lâu: client thử lại sau
+                    status, result = HTTPStatus.SERVICE_UNAVAILABLE, {"lỗi": str(exc)}
+                except Exception as exc:
+                    # lỗi store (sqlite, đĩa...) vẫn trả lời thay vì cắt kết nối
+                    traceback.print_exc(file=sys.stderr)
+                    status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {"lỗi": f"Lỗi máy chủ: {exc}"}
+                data = json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        return server
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API ghi/tra cứu buổi chạy")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--store", default=None, help="journal | sqlite | memory")
+    parser.add_argument("--athlete", default=None, help="ghi vào athletes/<vận động viên>/ thay cho thư mục hiện tại")
+    args = parser.parse_args(argv)
+
+    api = RunCoachAPI(open_store(args.store, athlete=args.athlete), streams=open_streams(args.athlete),
+                      profile=HRProfile.load(athlete_path(args.athlete, "hr_zones.json")))
+    server = await api.serve(args.host, args.port)
+    print(f"Running Coach API: http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
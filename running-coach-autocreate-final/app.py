@@ -1,153 +1,335 @@
 import os
+import xml.etree.ElementTree as ET
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import date
 
+from activity import read_activity
+from charts import ChartCache, render_load_chart, render_score_chart, render_stream_chart
+from history import build_history_table, plan_frame
+from plan import sessions
+from profiling import Profiler
+from schema import format_pace, parse_pace
+from scoring import (ZONE_COLUMN, CompiledRules, changed_types, load_rules, rate, rescore, rules_from_frame, rules_to_frame,
+                     save_rules)
+from storage import UNCHECKED, ConflictError, athlete_dir, athlete_path, athlete_slug, list_athletes, open_store
+from streams import open_streams
+from targets import target_index
+from training_load import LoadState, compute_load, trimp
+from zones import HRProfile, season_zone_percent, time_in_zones, zone_percent
+
 st.set_page_config(page_title="Running Coach - Tùy chọn buổi", layout="centered")
 
-@st.cache_data
-
-def load_data():
-    if not os.path.exists("data.csv"):
-        pd.DataFrame(columns=["Buổi", "Ngày chạy", "Pace", "HR", "SpO2 trước", "SpO2 sau", "RPE", "Tổng điểm", "Đánh giá"]).to_csv("data.csv", index=False)
-
-    try:
-        return pd.read_csv("data.csv")
-    except:
-        return pd.DataFrame(columns=["Buổi", "Ngày chạy", "Pace", "HR", "SpO2 trước", "SpO2 sau", "RPE", "Tổng điểm", "Đánh giá"])
-
-def save_data(df):
-    df.to_csv("data.csv", index=False)
-
-def score_tempo(row):
-    score = 0
-    if 135 <= row["HR"] <= 160: score += 30
-    if 4 <= row["RPE"] <= 6: score += 30
-    if 6.20 <= row["Pace"] <= 6.45: score += 30
-    if row["SpO2 sau"] >= 94: score += 10
-    return score
-
-def score_interval(row):
-    score = 0
-    if row["HR"] > 155: score += 35
-    if 7 <= row["RPE"] <= 9: score += 35
-    if row["SpO2 sau"] >= 93 and row["SpO2 trước"] - row["SpO2 sau"] <= 3: score += 20
-    if 6.10 <= row["Pace"] <= 6.30: score += 10
-    return score
-
-def score_longrun(row):
-    score = 0
-    if 125 <= row["HR"] <= 145: score += 30
-    if row["SpO2 sau"] >= 94 and abs(row["SpO2 trước"] - row["SpO2 sau"]) <= 2: score += 30
-    if 3 <= row["RPE"] <= 5: score += 30
-    if 6.45 <= row["Pace"] <= 7.20: score += 10
-    return score
-
-def rate(score):
-    if score >= 80: return "Tốt"
-    elif score >= 60: return "Trung bình"
-    else: return "Cần điều chỉnh"
-
-sessions = [
-    ("Tempo", "5–8km @ pace 6:45", "Zone 3–4"),
-    ("Interval", "6x800m @ pace 6:30", "Zone 4–5"),
-    ("Long run", "10km @ pace 7:00–7:30", "Zone 2"),
-    ("Tempo", "6km @ pace 6:40", "Zone 3–4"),
-    ("Interval", "8x400m @ pace 6:20", "Zone 4–5"),
-    ("Long run", "12km @ pace 7:00", "Zone 2"),
-    ("Tempo", "7km @ pace 6:35", "Zone 3–4"),
-    ("Interval", "4x1km @ pace 6:25", "Zone 4–5"),
-    ("Long run", "14km @ pace 6:55", "Zone 2"),
-    ("Tempo", "8km @ pace 6:30", "Zone 3–4"),
-    ("Interval", "10x300m @ pace 6:10", "Zone 4–5"),
-    ("Long run", "16km @ pace 6:50", "Zone 2"),
-    ("Tempo", "9km @ pace 6:25", "Zone 3–4"),
-    ("Interval", "5x1km @ pace 6:20", "Zone 4–5"),
-    ("Long run", "18km @ pace 6:45", "Zone 2"),
-    ("Tempo", "10km @ pace 6:20", "Zone 3–4")
-]
+@st.cache_resource(max_entries=512)
+def get_store(athlete):
+    # một store (kèm bản cache trong bộ nhớ) cho mỗi vận động viên, dùng chung giữa các phiên
+    return open_store(athlete=athlete)
+
+def load_data(columns=None):
+    # store giữ bản gộp trong bộ nhớ và chỉ đọc phần mới ghi thêm khi phiên bản dữ liệu đổi
+    return get_store(athlete).load(columns)
+
+def save_data(row, expected=UNCHECKED):
+    # expected: dòng của buổi này lúc người dùng mở form; phiên khác đã sửa thì store báo ConflictError
+    get_store(athlete).upsert(row, expected)
+
+def session_row(df, buoi):
+    match = df[df["Buổi"] == buoi]
+    return None if match.empty else match.iloc[-1].to_dict()
+
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache(max_entries=32)
+
+def load_state(df):
+    # trạng thái ATL/CTL lưu trên đĩa; lệch số buổi với lịch sử thì tính lại toàn bộ
+    state = LoadState.load(athlete_path(athlete, "load_state.json"))
+    if state is None or state.runs != df["Ngày chạy"].notna().sum():
+        state = LoadState.from_history(df)
+        state.save(athlete_path(athlete, "load_state.json"))
+    return state
+
+def add_athlete():
+    slug = athlete_slug(st.session_state["new_athlete"])
+    if slug:
+        athlete_dir(slug)
+        st.session_state["athlete"] = slug
+    st.session_state["new_athlete"] = ""
+
+def rules_version():
+    return os.path.getmtime("rules.json") if os.path.exists("rules.json") else 0
+
+@st.cache_resource
+def get_engine(version, hr_edges):
+    # mục tiêu HR của từng buổi theo vùng HR riêng của vận động viên
+    return CompiledRules(load_rules(), target_index(hr_edges=hr_edges))
+
+def get_profile(name):
+    return HRProfile.load(athlete_path(name, "hr_zones.json"))
+
+def sync_scores(name, rules):
+    # scored_rules.json ghi bộ quy tắc đã dùng để chấm lịch sử của vận động viên; quy tắc đổi (kể cả RULES mặc định
+    # trong code khi nâng cấp) -> chấm lại một lần các loại buổi bị ảnh hưởng, chưa có file thì chấm lại tất cả
+    path = athlete_path(name, "scored_rules.json")
+    if os.path.exists(path):
+        only_types = changed_types(load_rules(path), rules)
+    else:
+        only_types = set(rules) | set(session_types.values())
+    if not only_types:
+        return 0
+    rescored = rescore_athlete(name, rules, only_types)
+    save_rules(rules, path)
+    return rescored
+
+def rescore_athlete(name, rules, only_types):
+    # chấm lại lịch sử của một vận động viên, kèm % thời gian đúng vùng HR của các buổi có dữ liệu theo giây
+    profile = get_profile(name)
+    targets = target_index(hr_edges=profile.edges())
+    history = get_store(name).load()
+    types = history["Loại buổi"].astype(object).fillna(history["Buổi"].map(session_types))
+    history[ZONE_COLUMN] = history["Buổi"].map(season_zone_percent(open_streams(name), profile, targets))
+    updated = rescore(history, types, rules, only_types, targets)
+    if not updated.empty:
+        get_store(name).upsert_many(updated.to_dict("records"))
+    return len(updated)
+
+@st.cache_resource
+def get_plan():
+    # kế hoạch không đổi trong suốt process, chỉ dựng một lần thay vì mỗi lần rerun
+    plan = plan_frame(sessions)
+    return plan, dict(zip(plan["Buổi"], plan["Loại buổi"]))
+
+plan, session_types = get_plan()
 
 st.title("🏃‍♂️ Running Coach – Tuỳ chọn nhập & lịch sử")
 
-tab1, tab2, tab3, tab4 = st.tabs(["📥 Nhập kết quả", "📋 Lịch sử buổi chạy", "📊 Biểu đồ", "🧹 Reset dữ liệu"])
+with st.sidebar:
+    # "" là dữ liệu cũ ngay trong thư mục làm việc (trước khi có nhiều vận động viên)
+    athlete = st.selectbox("🏃 Vận động viên", [""] + list_athletes(), key="athlete", format_func=lambda a: a or "Mặc định")
+    st.text_input("Thêm vận động viên", key="new_athlete", on_change=add_athlete)
+
+# Bật bằng checkbox ở sidebar hoặc RUNNING_COACH_PROFILE=1; khi tắt các stage() không đo gì
+profiler = Profiler(enabled=st.sidebar.checkbox("🐞 Debug hiệu năng") or os.environ.get("RUNNING_COACH_PROFILE") == "1")
+
+with profiler.stage("rescore"):
+    sync_scores(athlete, load_rules())
 
-with tab1:
+# Một snapshot dùng chung cho mọi tab trong lần chạy này
+with profiler.stage("load_data"):
+    data_version = get_store(athlete).version()
     df = load_data()
-    session_choice = st.selectbox("Chọn buổi để nhập kết quả", range(1, 17))
-    session_index = session_choice - 1
-    buoi_type, noidung, zone = sessions[session_index]
-    st.write(f"**Loại buổi:** {buoi_type}")
-    st.write(f"**Nội dung:** {noidung}")
-    st.write(f"**Target HR Zone:** {zone}")
-
-    with st.form("log_run_form"):
-        day = st.date_input("Ngày chạy", value=date.today())
-        pace = st.number_input("Pace (min/km)", step=0.1)
-        hr = st.number_input("HR trung bình", step=1)
-        spo2_before = st.number_input("SpO2 trước chạy", step=1)
-        spo2_after = st.number_input("SpO2 sau chạy", step=1)
-        rpe = st.slider("RPE (1–10)", 1, 10, 5)
-        submit = st.form_submit_button("Lưu kết quả")
-
-        if submit:
-            new_row = {
-                "Buổi": session_choice,
-                "Ngày chạy": day,
-                "Pace": pace,
-                "HR": hr,
-                "SpO2 trước": spo2_before,
-                "SpO2 sau": spo2_after,
-                "RPE": rpe
-            }
-
-            if buoi_type == "Tempo":
-                score = score_tempo(new_row)
-            elif buoi_type == "Interval":
-                score = score_interval(new_row)
+
+VIEWS = ["📥 Nhập kết quả", "📋 Lịch sử buổi chạy", "📊 Biểu đồ", "⚙️ Ngưỡng điểm", "🧹 Reset dữ liệu"]
+
+# st.tabs chạy thân của mọi tab ở mỗi lần rerun; mặc định chỉ chạy chế độ xem đang chọn.
+# RUNNING_COACH_LAYOUT=tabs giữ giao diện tab cũ.
+if os.environ.get("RUNNING_COACH_LAYOUT") == "tabs":
+    panes = dict(zip(VIEWS, st.tabs(VIEWS)))
+else:
+    view = st.radio("Chế độ xem", VIEWS, horizontal=True, key="view", label_visibility="collapsed")
+    panes = {view: st.container()}
+
+if VIEWS[0] in panes:
+    with panes[VIEWS[0]]:
+        session_choice = st.selectbox("Chọn buổi để nhập kết quả", range(1, len(sessions) + 1))
+        session_index = session_choice - 1
+        buoi_type, noidung, zone = sessions[session_index]
+        st.write(f"**Loại buổi:** {buoi_type}")
+        st.write(f"**Nội dung:** {noidung}")
+        st.write(f"**Target HR Zone:** {zone}")
+        # dòng của từng buổi như lần rerun trước hiển thị, để phát hiện phiên khác ghi chen vào
+        seen_rows = st.session_state.setdefault("seen_rows", {}).setdefault(athlete, {})
+
+        # file từ đồng hồ điền sẵn ngày, pace, HR, thời gian; chỉ đọc lại khi đổi file
+        uploaded = st.file_uploader("Hoặc tải file từ đồng hồ (GPX/TCX/FIT)", type=["gpx", "tcx", "fit"])
+        activity = None
+        if uploaded is not None:
+            cached = st.session_state.get("activity")
+            if cached is None or cached[0] != uploaded.file_id:
+                try:
+                    with profiler.stage("read_activity"):
+                        st.session_state["activity"] = cached = (uploaded.file_id, *read_activity(uploaded))
+                except (ValueError, ImportError, ET.ParseError) as exc:
+                    st.session_state["activity"] = cached = (uploaded.file_id, None, str(exc))
+            if cached[1] is None:
+                st.error(f"Không đọc được file: {cached[2]}")
             else:
-                score = score_longrun(new_row)
+                activity = cached[1:]
+                st.caption(f"Cự ly {activity[0]['Cự ly (m)'] / 1000:.2f} km, {len(activity[1]['Giây'])} mẫu theo giây")
+        filled = activity[0] if activity else {}
 
-            new_row["Tổng điểm"] = score
-            new_row["Đánh giá"] = rate(score)
+        def prefill(name, default, cast):
+            value = filled.get(name)
+            return default if value is None or pd.isna(value) else cast(value)
 
-            df = df[df["Buổi"] != session_choice]  # xoá nếu đã có buổi này
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            save_data(df)
-            st.success(f"✅ Đã lưu kết quả Buổi #{session_choice}")
+        with st.form("log_run_form"):
+            day = st.date_input("Ngày chạy", value=prefill("Ngày chạy", date.today(), date.fromisoformat))
+            pace_text = st.text_input("Pace (phút:giây/km, vd 6:45)", value=prefill("Pace", "", format_pace))
+            hr = st.number_input("HR trung bình", value=prefill("HR", 0, int), step=1)
+            spo2_before = st.number_input("SpO2 trước chạy", value=prefill("SpO2 trước", 0, round), step=1)
+            spo2_after = st.number_input("SpO2 sau chạy", value=prefill("SpO2 sau", 0, round), step=1)
+            rpe = st.slider("RPE (1–10)", 1, 10, 5)
+            duration = st.number_input("Thời gian (phút)", value=prefill("Thời gian (phút)", 0, int), step=1)
+            submit = st.form_submit_button("Lưu kết quả")
+            pace = parse_pace(pace_text)
 
-with tab2:
-    df = load_data()
-    st.subheader("📋 Lịch sử 16 buổi luyện tập")
-    table = pd.DataFrame([
-        {
-            "Buổi": i+1,
-            "Loại buổi": sessions[i][0],
-            "Đánh giá": df[df["Buổi"] == i+1]["Đánh giá"].values[0] if (df["Buổi"] == i+1).any() else "⏳ Chưa nhập",
-            "Tổng điểm": df[df["Buổi"] == i+1]["Tổng điểm"].values[0] if (df["Buổi"] == i+1).any() else ""
-        }
-        for i in range(16)
-    ])
-    st.dataframe(table)
-
-with tab3:
-    df = load_data()
-    if not df.empty:
-        df = df.sort_values("Buổi")
-        fig, ax = plt.subplots()
-        ax.plot(df["Buổi"], df["Tổng điểm"], marker="o", linestyle="--")
-        ax.axhline(80, color='green', linestyle='--', label="Tốt")
-        ax.axhline(60, color='orange', linestyle='--', label="Trung bình")
-        ax.set_xlabel("Buổi chạy")
-        ax.set_ylabel("Tổng điểm")
-        ax.set_title("Biểu đồ hiệu quả luyện tập theo buổi")
-        ax.legend()
-        st.pyplot(fig)
-    else:
-        st.info("Chưa có dữ liệu để hiển thị biểu đồ.")
+            if submit and pace is None:
+                st.error("Pace phải có dạng phút:giây, ví dụ 6:45")
+            elif submit:
+                new_row = {
+                    "Buổi": session_choice,
+                    "Ngày chạy": day,
+                    "Loại buổi": buoi_type,
+                    "Pace": pace,
+                    "HR": hr,
+                    "SpO2 trước": spo2_before,
+                    "SpO2 sau": spo2_after,
+                    "RPE": rpe,
+                    "Thời gian (phút)": duration
+                }
+
+                with profiler.stage("score"):
+                    profile = get_profile(athlete)
+                    engine = get_engine(rules_version(), profile.edges())
+                    streams = open_streams(athlete)
+                    if activity:
+                        new_row[ZONE_COLUMN] = zone_percent([activity[1]], [session_choice], profile, engine.targets).iloc[0]
+                    elif streams.version(session_choice) is not None:
+                        new_row[ZONE_COLUMN] = season_zone_percent(streams, profile, engine.targets, [session_choice]).iloc[0]
+                    score = engine.score_row(buoi_type, new_row)
+                    new_row["Tổng điểm"] = score
+                    new_row["Đánh giá"] = rate(score)
+
+                try:
+                    with profiler.stage("save"):
+                        replaced = (df["Buổi"] == session_choice).any()
+                        state = load_state(df)
+                        save_data(new_row, seen_rows.get(session_choice, UNCHECKED))  # upsert theo "Buổi"
+                        if activity:
+                            streams.save(session_choice, activity[1])
+                        data_version = get_store(athlete).version()
+                        df = load_data()
+                        if replaced or not state.add(day, trimp(duration, hr, rpe)):
+                            state = LoadState.from_history(df)
+                        state.save(athlete_path(athlete, "load_state.json"))
+                    st.success(f"✅ Đã lưu kết quả Buổi #{session_choice}")
+                except ConflictError:
+                    st.warning(f"⚠️ Buổi #{session_choice} vừa được lưu ở một phiên khác. Xem lại lịch sử rồi bấm Lưu lần nữa nếu muốn ghi đè.")
+                except TimeoutError:
+                    st.error("Dữ liệu đang được ghi ở nơi khác, vui lòng thử lại.")
+        seen_rows[session_choice] = session_row(df, session_choice)
+
+if VIEWS[1] in panes:
+    with panes[VIEWS[1]]:
+        st.subheader(f"📋 Lịch sử {len(sessions)} buổi luyện tập")
+        with profiler.stage("history_table"):
+            table = build_history_table(plan, df)
+        st.dataframe(table)
+
+if VIEWS[2] in panes:
+    with panes[VIEWS[2]]:
+        if not df.empty:
+            with profiler.stage("score_chart"):
+                png = get_chart_cache().get_or_render(
+                    ("score_by_session", athlete, data_version, "png"),
+                    lambda: render_score_chart(df[["Buổi", "Tổng điểm"]], fmt="png"),
+                )
+            st.image(png)
+
+            st.subheader("Tải tập luyện (TRIMP)")
+            with profiler.stage("training_load"):
+                atl, ctl, tsb = load_state(df).at(date.today())
+            col1, col2, col3 = st.columns(3)
+            col1.metric("ATL – mệt mỏi", f"{atl:.0f}")
+            col2.metric("CTL – thể lực", f"{ctl:.0f}")
+            col3.metric("TSB – phong độ", f"{tsb:.0f}")
+            with profiler.stage("load_chart"):
+                png = get_chart_cache().get_or_render(
+                    ("training_load", athlete, data_version, "png"),
+                    lambda: render_load_chart(compute_load(df), fmt="png"),
+                )
+            st.image(png)
+
+            # dữ liệu theo giây chỉ được đọc khi mở biểu đồ này, và chỉ đoạn đang xem
+            streams = open_streams(athlete)
+            with_stream = streams.sessions()
+            if with_stream:
+                st.subheader("Dữ liệu theo giây từ đồng hồ")
+                buoi = st.selectbox("Buổi có dữ liệu đồng hồ", with_stream, key="stream_session")
+                seconds = streams.load(buoi, ["Giây"])["Giây"]
+                total = int(seconds[-1]) // 60 + 1 if len(seconds) else 1
+                start, end = st.slider("Đoạn (phút)", 0, total, (0, total), key="stream_range")
+                with profiler.stage("stream_chart"):
+                    png = get_chart_cache().get_or_render(
+                        ("stream", athlete, buoi, streams.version(buoi), start, end, "png"),
+                        lambda: render_stream_chart(streams.frame(buoi, start * 60, end * 60, ["Giây", "HR", "Pace (giây/km)"]), fmt="png"),
+                    )
+                st.image(png)
+                samples = streams.load(buoi, ["Giây", "HR"])
+                if "HR" in samples:
+                    edges = get_profile(athlete).edges()
+                    minutes = time_in_zones(samples["Giây"], samples["HR"], edges)[0] / 60
+                    st.dataframe(pd.DataFrame({
+                        "Vùng": ["Dưới vùng 1"] + [f"Zone {z}" for z in range(1, 6)],
+                        "HR": [f"< {edges[0]}"] + [f"{edges[z]}–{edges[z + 1]}" for z in range(5)],
+                        "Phút": minutes.round(1),
+                    }), hide_index=True)
+        else:
+            st.info("Chưa có dữ liệu để hiển thị biểu đồ.")
+
+if VIEWS[3] in panes:
+    with panes[VIEWS[3]]:
+        st.subheader("⚙️ Ngưỡng chấm điểm")
+        rules = load_rules()
+        edited = st.data_editor(
+            rules_to_frame(rules),
+            disabled=["Loại buổi", "Quy tắc", "Điểm", "Chỉ số", "Phép so sánh"],
+            hide_index=True,
+        )
+        if st.button("💾 Lưu ngưỡng & chấm lại lịch sử"):
+            new_rules = rules_from_frame(edited)
+            types_changed = changed_types(rules, new_rules)
+            if types_changed:
+                save_rules(new_rules)
+                # ngưỡng dùng chung cho cả câu lạc bộ: chấm lại lịch sử của mọi vận động viên
+                with profiler.stage("rescore"):
+                    rescored = sum(sync_scores(other, new_rules) for other in [""] + list_athletes())
+                data_version = get_store(athlete).version()
+                df = load_data()
+                st.success(f"✅ Đã chấm lại {rescored} buổi ({', '.join(sorted(types_changed))})")
+            else:
+                st.info("Không có ngưỡng nào thay đổi.")
+
+        st.subheader("❤️ Vùng HR của vận động viên")
+        profile = get_profile(athlete)
+        hr_max = st.number_input("HR tối đa", value=int(profile.hr_max), step=1)
+        hr_threshold = st.number_input("HR ngưỡng (0 = tính vùng theo HR tối đa)", value=int(profile.hr_threshold or 0), step=1)
+        st.caption("Ranh giới vùng 1–5: " + " / ".join(str(e) for e in HRProfile(hr_max, hr_threshold or None).edges()))
+        if st.button("💾 Lưu vùng HR & chấm lại lịch sử"):
+            HRProfile(hr_max, hr_threshold or None).save(athlete_path(athlete, "hr_zones.json"))
+            rules = load_rules()
+            with profiler.stage("rescore"):
+                rescored = rescore_athlete(athlete, rules, set(rules) | set(session_types.values()))
+            data_version = get_store(athlete).version()
+            df = load_data()
+            st.success(f"✅ Đã lưu vùng HR, chấm lại {rescored} buổi")
+
+if VIEWS[4] in panes:
+    with panes[VIEWS[4]]:
+        if st.button("🧹 Xoá toàn bộ dữ liệu (reset chu kỳ)"):
+            get_store(athlete).reset()
+            open_streams(athlete).reset()
+            st.success("🎉 Đã xoá toàn bộ dữ liệu! Chu kỳ mới đã sẵn sàng.")
 
-with tab4:
-    if st.button("🧹 Xoá toàn bộ dữ liệu (reset chu kỳ)"):
-        save_data(pd.DataFrame(columns=["Buổi", "Ngày chạy", "Pace", "HR", "SpO2 trước", "SpO2 sau", "RPE", "Tổng điểm", "Đánh giá"]))
-        st.success("🎉 Đã xoá toàn bộ dữ liệu! Chu kỳ mới đã sẵn sàng.")
+if profiler.enabled:
+    profiler.count("store", dict(get_store(athlete).stats))
+    profiler.count("chart_cache", dict(get_chart_cache().stats))
+    profiler.export("profile.jsonl")
+    with st.sidebar:
+        st.subheader("⏱️ Thời gian rerun")
+        timings = pd.DataFrame(profiler.stages, columns=["Bước", "Giây"])
+        timings["ms"] = (timings.pop("Giây") * 1000).round(1)
+        st.dataframe(timings, hide_index=True)
+        st.caption(f"Tổng: {profiler.total() * 1000:.1f} ms")
+        st.json(profiler.counters)
@@ -0,0 +1,62 @@
+# Một process phục vụ nhiều vận động viên: mỗi lần load chỉ đọc thư mục của một người,
+# so với gộp cả câu lạc bộ vào một data.csv rồi lọc.
+#   python benchmarks/bench_athletes.py --athletes 300 --runs 16
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from suite import synthetic_history  # noqa: E402
+
+from schema import typed  # noqa: E402
+from storage import JournalStore, athlete_path  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--athletes", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        names = [f"vdv-{i:04d}" for i in range(args.athletes)]
+        club = synthetic_history(args.athletes * args.runs)
+        club["Vận động viên"] = np.repeat(names, args.runs)
+        club.to_csv("club.csv", index=False)
+        for name, runs in club.groupby("Vận động viên"):
+            runs.drop(columns="Vận động viên").to_csv(athlete_path(name, "data.csv"), index=False)
+
+        stores = {}
+        start = time.perf_counter()
+        for name in names:
+            stores[name] = JournalStore(athlete_path(name, "data.csv"))
+            stores[name].load()
+        cold = (time.perf_counter() - start) / len(names)
+
+        start = time.perf_counter()
+        for name in names:
+            stores[name].load()
+        warm = (time.perf_counter() - start) / len(names)
+
+        # file chung đổi mỗi khi bất kỳ ai ghi, nên mỗi lần load gần như phải đọc lại cả file rồi lọc
+        start = time.perf_counter()
+        for name in names[:20]:
+            df = typed(pd.read_csv("club.csv"))
+            df = df[df["Vận động viên"] == name]
+        single = (time.perf_counter() - start) / 20
+
+    print(f"{args.athletes} vận động viên × {args.runs} buổi")
+    print(f"thư mục riêng, lần đầu:     {cold * 1000:7.2f} ms/lần load")
+    print(f"thư mục riêng, đã cache:    {warm * 1000:7.2f} ms/lần load")
+    print(f"một file chung, đọc lại:    {single * 1000:7.2f} ms/lần load ({args.athletes * args.runs} dòng)")
+
+
+if __name__ == "__main__":
+    main()
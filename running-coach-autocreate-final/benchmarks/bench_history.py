@@ -0,0 +1,63 @@
+# So sánh cách dựng bảng lịch sử cũ (lọc df cho từng buổi) với build_history_table.
+#   python benchmarks/bench_history.py --sizes 16 200 1000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from history import PENDING, build_history_table, plan_frame  # noqa: E402
+
+
+def legacy_table(sessions, df):
+    return pd.DataFrame([
+        {
+            "Buổi": i+1,
+            "Loại buổi": sessions[i][0],
+            "Đánh giá": df[df["Buổi"] == i+1]["Đánh giá"].values[0] if (df["Buổi"] == i+1).any() else PENDING,
+            "Tổng điểm": df[df["Buổi"] == i+1]["Tổng điểm"].values[0] if (df["Buổi"] == i+1).any() else ""
+        }
+        for i in range(len(sessions))
+    ])
+
+
+def synthetic(plan_length, seed=0):
+    rng = np.random.default_rng(seed)
+    sessions = [(t, "", "") for t in rng.choice(["Tempo", "Interval", "Long run"], plan_length)]
+    done = np.sort(rng.choice(np.arange(1, plan_length + 1), plan_length * 3 // 4, replace=False))
+    scores = rng.integers(0, 101, len(done))
+    results = pd.DataFrame({
+        "Buổi": done,
+        "Tổng điểm": scores,
+        "Đánh giá": np.where(scores >= 80, "Tốt", np.where(scores >= 60, "Trung bình", "Cần điều chỉnh")),
+    })
+    return sessions, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 200, 1000, 5000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        sessions, results = synthetic(size)
+
+        start = time.perf_counter()
+        old = legacy_table(sessions, results)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = build_history_table(plan_frame(sessions), results)
+        merged = time.perf_counter() - start
+
+        assert new["Đánh giá"].tolist() == old["Đánh giá"].tolist()
+        assert new["Tổng điểm"].fillna(-1).tolist() == old["Tổng điểm"].replace("", -1).tolist()
+        print(f"{size} buổi: lọc từng buổi {legacy:.4f}s, merge {merged:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
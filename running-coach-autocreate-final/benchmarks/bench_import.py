@@ -0,0 +1,101 @@
+# Đọc file GPX/TCX: thời gian và bộ nhớ đỉnh theo độ dài buổi chạy (ElementTree.parse dựng cả cây so với iterparse
+# xoá từng điểm), và nhập hàng loạt nhiều file với nhiều process.
+#   python benchmarks/bench_import.py --points 7000 36000 --files 64 --workers 1 4
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from activity import _children, _local, read_activity  # noqa: E402
+from import_runs import import_files  # noqa: E402
+from storage import JournalStore  # noqa: E402
+from streams import StreamStore  # noqa: E402
+
+GPX_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1" '
+            'xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1"><trk><trkseg>\n')
+TCX_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">'
+            '<Activities><Activity Sport="Running"><Lap><Track>\n')
+
+
+def write_activity(path, points, seed=0, day=0):
+    # chạy thẳng về phía bắc ~6:30/km, HR tăng dần; ghi ra theo từng dòng để chính việc tạo file không tốn bộ nhớ
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1, 5, 30, tzinfo=timezone.utc) + timedelta(days=day)
+    step = 1000 / 390 / 111_195
+    tcx = path.endswith(".tcx")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(TCX_HEAD if tcx else GPX_HEAD)
+        for i in range(points):
+            stamp = (start + timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            hr = int(130 + 30 * i / points + rng.integers(-3, 4))
+            if tcx:
+                f.write(f"<Trackpoint><Time>{stamp}</Time><DistanceMeters>{i * 1000 / 390:.1f}</DistanceMeters>"
+                        f"<HeartRateBpm><Value>{hr}</Value></HeartRateBpm></Trackpoint>\n")
+            else:
+                f.write(f'<trkpt lat="{10.7 + i * step:.7f}" lon="106.7"><time>{stamp}</time>'
+                        f"<extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>{hr}</gpxtpx:hr>"
+                        f"</gpxtpx:TrackPointExtension></extensions></trkpt>\n")
+        f.write("</Track></Lap></Activity></Activities></TrainingCenterDatabase>" if tcx else "</trkseg></trk></gpx>")
+
+
+def dom_read(path):
+    # cách làm thường gặp: dựng cả cây rồi duyệt các điểm
+    tree = ET.parse(path)
+    return [_children(point) for point in tree.iter() if _local(point.tag) in ("trkpt", "Trackpoint")]
+
+
+def peak(fn):
+    # đo thời gian riêng, vì tracemalloc làm chậm mọi lần cấp phát
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, top
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[7000, 36000])
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.points:
+            for ext in ["gpx", "tcx"]:
+                path = os.path.join(workdir, f"run_{n}.{ext}")
+                write_activity(path, n)
+                dom_time, dom_peak = peak(lambda: dom_read(path))
+                stream_time, stream_peak = peak(lambda: read_activity(path))
+                print(f"{ext} {n:>6} điểm: cả cây {dom_time:5.2f}s / {dom_peak / 2**20:6.1f} MB,"
+                      f" theo luồng {stream_time:5.2f}s / {stream_peak / 2**20:5.1f} MB (gồm cả mẫu theo giây)")
+
+        paths = []
+        for i in range(args.files):
+            paths.append(os.path.join(workdir, f"bulk_{i:03d}.gpx"))
+            write_activity(paths[-1], 3600, seed=i, day=i)
+        for workers in args.workers:
+            folder = os.path.join(workdir, f"w{workers}")
+            os.makedirs(folder)
+            start = time.perf_counter()
+            # kế hoạch chỉ có 16 buổi: các file sau đó bị bỏ qua nhưng vẫn được đọc hết
+            import_files(paths, JournalStore(os.path.join(folder, "data.csv")), StreamStore(os.path.join(folder, "streams")), workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"nhập {args.files} file × 3600 điểm, {workers} process: {elapsed:.2f}s ({args.files / elapsed:.1f} file/s)")
+
+
+if __name__ == "__main__":
+    main()
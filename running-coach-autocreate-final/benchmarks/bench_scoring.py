@@ -0,0 +1,52 @@
+# So sánh chấm điểm từng dòng (score_session + rate) với score_frame.
+#   python benchmarks/bench_scoring.py --rows 100000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scoring import rate, score_frame, score_session  # noqa: E402
+
+
+def synthetic_runs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    spo2_before = rng.integers(93, 100, n)
+    return pd.DataFrame({
+        "Buổi": np.arange(1, n + 1),
+        "Loại buổi": rng.choice(["Tempo", "Interval", "Long run"], n),
+        "Pace": rng.integers(580, 760, n) / 100,
+        "HR": rng.integers(115, 180, n),
+        "SpO2 trước": spo2_before,
+        "SpO2 sau": spo2_before - rng.integers(0, 6, n),
+        "RPE": rng.integers(1, 11, n),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = synthetic_runs(args.rows)
+
+    start = time.perf_counter()
+    scores = [score_session(r["Loại buổi"], r) for r in df.to_dict("records")]
+    ratings = [rate(s) for s in scores]
+    per_row = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scored = score_frame(df)
+    batch = time.perf_counter() - start
+
+    assert scored["Tổng điểm"].tolist() == scores
+    assert scored["Đánh giá"].tolist() == ratings
+    print(f"{args.rows} dòng: từng dòng {per_row:.3f}s, score_frame {batch:.4f}s, nhanh hơn {per_row / batch:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Đo thời gian khởi động lạnh: import từng module và lần chạy đầu của app (first paint),
+# mỗi phép đo trong một process Python mới.
+#   python benchmarks/bench_startup.py --repeat 5
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODULES = ["pandas", "streamlit", "storage", "scoring", "history", "training_load", "charts", "matplotlib.figure"]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {here!r})
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+FIRST_PAINT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "matplotlib": "matplotlib" in sys.modules,
+    "error": bool(at.exception),
+}}))
+"""
+
+
+def run_snippet(code, cwd):
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def best_of(code, cwd, repeat):
+    results = [run_snippet(code, cwd) for _ in range(repeat)]
+    return min(results, key=lambda r: r["seconds"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for module in MODULES:
+            result = best_of(IMPORT_SNIPPET.format(here=HERE, module=module), workdir, args.repeat)
+            print(f"import {module:<20} {result['seconds'] * 1000:8.1f} ms")
+
+        result = best_of(FIRST_PAINT_SNIPPET.format(app=os.path.join(HERE, "app.py")), workdir, args.repeat)
+        print(f"{'first paint (app.py)':<27} {result['seconds'] * 1000:8.1f} ms"
+              f"  matplotlib đã import: {result['matplotlib']}  lỗi: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Dữ liệu theo giây: cắt 10 phút của một buổi từ memmap .npy so với đọc lại cả file CSV mẫu,
+# và thời gian load lịch sử tóm tắt khi đã có / chưa có stream (không được chậm đi).
+#   python benchmarks/bench_streams.py --samples 7000 --sessions 16
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from suite import synthetic_history, timed  # noqa: E402
+
+from storage import JournalStore  # noqa: E402
+from streams import StreamStore  # noqa: E402
+
+
+def synthetic_stream(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return {
+        "Giây": t,
+        "HR": np.clip(120 + 40 * t / n + rng.normal(0, 3, n), 60, 200).round(),
+        "Pace (giây/km)": np.clip(390 + rng.normal(0, 15, n), 200, 900).round(),
+        "SpO2": np.clip(97 + rng.normal(0, 1, n), 80, 100).round(),
+        "Cự ly (m)": np.cumsum(np.full(n, 1000 / 390)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=7000)
+    parser.add_argument("--sessions", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "data.csv")
+        synthetic_history(args.sessions).to_csv(csv_path, index=False)
+        summary_before = timed(lambda: JournalStore(csv_path).load(), repeat=5)
+
+        streams = StreamStore(os.path.join(workdir, "streams"))
+        write = timed(lambda: [streams.save(b, synthetic_stream(args.samples, b)) for b in range(1, args.sessions + 1)])
+        summary_after = timed(lambda: JournalStore(csv_path).load(), repeat=5)
+
+        samples_csv = os.path.join(workdir, "samples.csv")
+        pd.DataFrame(synthetic_stream(args.samples)).to_csv(samples_csv, index=False)
+        start, end = 1800, 2400
+
+        def from_csv():
+            df = pd.read_csv(samples_csv)
+            return df[(df["Giây"] >= start) & (df["Giây"] < end)]
+
+        csv_slice = timed(from_csv, repeat=5)
+        memmap_slice = timed(lambda: streams.window(1, start, end, ["Giây", "HR", "Pace (giây/km)"]), repeat=5)
+        frame_slice = timed(lambda: streams.frame(1, start, end, ["Giây", "HR", "Pace (giây/km)"]), repeat=5)
+        folder = os.path.join(streams.root, "1")
+        disk = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder))
+        csv_disk = os.path.getsize(samples_csv)
+
+    print(f"{args.sessions} buổi × {args.samples} mẫu, {disk / 1024:.0f} KB/buổi (CSV: {csv_disk / 1024:.0f} KB)")
+    print(f"ghi stream:                 {write * 1000 / args.sessions:7.2f} ms/buổi")
+    print(f"cắt 10 phút từ CSV mẫu:     {csv_slice * 1000:7.2f} ms")
+    print(f"cắt 10 phút từ memmap:      {memmap_slice * 1000:7.2f} ms (DataFrame: {frame_slice * 1000:.2f} ms)")
+    print(f"load lịch sử tóm tắt:       {summary_before * 1000:7.2f} ms trước, {summary_after * 1000:.2f} ms sau khi có stream")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Đo độ trễ mỗi lần tương tác trong app: giao diện st.tabs cũ (mọi tab chạy mỗi lần rerun)
+# so với chế độ xem chỉ chạy phần đang chọn.
+#   python benchmarks/bench_views.py --rows 16 2000 --repeat 5
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from suite import synthetic_history  # noqa: E402
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP = os.path.join(os.path.dirname(__file__), "..", "app.py")
+
+
+def rerun_ms(at, action):
+    start = time.perf_counter()
+    action(at)
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed * 1000
+
+
+def interactions(at, repeat):
+    # chọn buổi khác trong form nhập, rồi lưu một kết quả (dữ liệu đổi nên biểu đồ phải vẽ lại nếu có chạy)
+    choices = at.selectbox[0].options
+    select = [rerun_ms(at, lambda a, i=i: a.selectbox[0].set_value(int(choices[i % len(choices)]))) for i in range(repeat)]
+    submit = []
+    for i in range(repeat):
+        def save(a, i=i):
+            a.number_input[0].set_value(6.3 + i / 100)
+            a.number_input[1].set_value(150)
+            a.number_input[4].set_value(45)
+            a.button[0].click()
+        submit.append(rerun_ms(at, save))
+    return min(select), min(submit)
+
+
+def bench_layout(layout, rows, repeat):
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            synthetic_history(rows).to_csv("data.csv", index=False)
+            if layout == "tabs":
+                os.environ["RUNNING_COACH_LAYOUT"] = "tabs"
+            else:
+                os.environ.pop("RUNNING_COACH_LAYOUT", None)
+            at = AppTest.from_file(APP, default_timeout=120)
+            at.run()
+            return interactions(at, repeat)
+        finally:
+            os.chdir(cwd)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[16, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    os.environ.pop("RUNNING_COACH_STORE", None)
+    print(f"{'rows':>6}  {'layout':>6}  {'chọn buổi (ms)':>15}  {'lưu kết quả (ms)':>17}")
+    for rows in args.rows:
+        for layout in ("tabs", "views"):
+            select, submit = bench_layout(layout, rows, args.repeat)
+            print(f"{rows:>6}  {layout:>6}  {select:>15.1f}  {submit:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
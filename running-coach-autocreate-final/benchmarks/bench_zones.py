@@ -0,0 +1,59 @@
+# Thời gian trong từng vùng HR cho cả mùa: vòng lặp Python từng mẫu, NumPy từng buổi, và một lượt NumPy cho mọi buổi.
+#   python benchmarks/bench_zones.py --runs 200 --samples 7000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from zones import MAX_GAP, ZONE_SLOTS, HRProfile, time_in_zones  # noqa: E402
+
+
+def python_loop(seconds, hr, edges):
+    by_zone = [0.0] * ZONE_SLOTS
+    for i in range(len(seconds) - 1):
+        if hr[i] > 0:
+            zone = sum(hr[i] >= e for e in edges[:-1])
+            by_zone[zone] += min(seconds[i + 1] - seconds[i], MAX_GAP)
+    return by_zone
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=7000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    edges = HRProfile().edges()
+    runs = [(np.arange(args.samples, dtype=np.int32), rng.integers(100, 185, args.samples).astype(np.int16)) for _ in range(args.runs)]
+
+    start = time.perf_counter()
+    python_loop(runs[0][0].tolist(), runs[0][1].tolist(), edges)
+    loop = (time.perf_counter() - start) * args.runs
+
+    def best(fn, repeat=5):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        return result, min(times)
+
+    per_run, numpy_runs = best(lambda: np.vstack([time_in_zones(t, hr, edges) for t, hr in runs]))
+    seconds = np.concatenate([t for t, _ in runs])
+    hrs = np.concatenate([hr for _, hr in runs])
+    season, single = best(lambda: time_in_zones(seconds, hrs, edges, [len(t) for t, _ in runs]))
+
+    assert np.allclose(per_run, season)
+    print(f"{args.runs} buổi × {args.samples} mẫu")
+    print(f"vòng lặp Python (ước tính từ 1 buổi): {loop:8.3f}s")
+    print(f"NumPy từng buổi:                      {numpy_runs:8.3f}s")
+    print(f"NumPy một lượt cả mùa:                {single:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Load test cho api.py với MemoryStore (không đụng tới dữ liệu thật).
+#   python benchmarks/load_api.py --clients 50 --requests 200
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api import RunCoachAPI  # noqa: E402
+from storage import MemoryStore  # noqa: E402
+
+
+async def client(port, n, client_id, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(n):
+        body = json.dumps({
+            "Ngày chạy": "2025-05-01", "Pace": 6.3, "HR": 140 + i % 30,
+            "SpO2 trước": 97, "SpO2 sau": 95, "RPE": 5, "Thời gian (phút)": 45,
+        }).encode()
+        buoi = (client_id + i) % 16 + 1
+        start = time.perf_counter()
+        writer.write(
+            f"PUT /sessions/{buoi} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    api = RunCoachAPI(MemoryStore())
+    server = await api.serve("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, args.requests, c, latencies) for c in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await api.batcher.stop()
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"{total} request trong {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    print(f"p50 {latencies[total // 2] * 1000:.1f}ms, p95 {latencies[int(total * 0.95)] * 1000:.1f}ms, "
+          f"p99 {latencies[int(total * 0.99)] * 1000:.1f}ms")
+    print(f"{api.batcher.rows} dòng ghi trong {api.batcher.batches} lần commit "
+          f"(trung bình {api.batcher.rows / max(api.batcher.batches, 1):.1f} dòng/lần)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
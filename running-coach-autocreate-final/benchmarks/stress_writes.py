@@ -0,0 +1,102 @@
+# Nhiều process × nhiều thread cùng ghi vào một store:
+#  - "ghi riêng": mỗi người ghi các buổi của riêng mình, journal gộp liên tục ở nền -> không được mất buổi nào
+#  - "tăng đếm": mọi người cùng đọc-sửa-ghi vài buổi chung với expected, gặp ConflictError thì đọc lại -> tổng không được hụt
+#  - thời gian chờ khoá ghi: in p99 và báo lỗi nếu vượt --max-p99-ms
+#   python benchmarks/stress_writes.py --processes 4 --threads 2 --writes 30 --store journal
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from storage import ConflictError, JournalStore, SqliteStore  # noqa: E402
+
+SHARED_SESSIONS = 4
+
+
+def open_backend(kind, workdir):
+    if kind == "sqlite":
+        return SqliteStore(os.path.join(workdir, "data.db"), legacy_csv=None)
+    return JournalStore(os.path.join(workdir, "data.csv"), compact_every=25)
+
+
+def run_row(buoi, minutes):
+    return {"Buổi": buoi, "Ngày chạy": "2024-01-01", "Loại buổi": "Tempo", "Pace": 6.5, "HR": 150,
+            "SpO2 trước": 98, "SpO2 sau": 96, "RPE": 5, "Thời gian (phút)": minutes, "Tổng điểm": 0, "Đánh giá": "Cần điều chỉnh"}
+
+
+def worker(kind, workdir, worker_id, threads, writes):
+    store = open_backend(kind, workdir)
+    conflicts = [0] * threads
+
+    def own_rows(t):
+        base = 1000 + (worker_id * threads + t) * writes
+        for i in range(writes):
+            store.upsert(run_row(base + i, i))
+
+    def increments(t):
+        for i in range(writes):
+            buoi = 1 + (t + i) % SHARED_SESSIONS
+            while True:
+                seen = store.get(buoi)
+                minutes = 0 if seen is None else int(seen["Thời gian (phút)"])
+                try:
+                    store.upsert(run_row(buoi, minutes + 1), expected=seen)
+                    break
+                except ConflictError:
+                    conflicts[t] += 1
+
+    pool = [threading.Thread(target=own_rows, args=(t,)) for t in range(threads)]
+    pool += [threading.Thread(target=increments, args=(t,)) for t in range(threads)]
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    lock = getattr(store, "file_lock", None)
+    return sum(conflicts), list(lock.waits) if lock else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--writes", type=int, default=30)
+    parser.add_argument("--store", choices=["journal", "sqlite"], default="journal")
+    parser.add_argument("--max-p99-ms", type=float, default=250.0, help="p99 thời gian chờ khoá ghi cho phép (journal)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        open_backend(args.store, workdir)
+        start = time.perf_counter()
+        with ProcessPoolExecutor(args.processes) as pool:
+            futures = [pool.submit(worker, args.store, workdir, p, args.threads, args.writes) for p in range(args.processes)]
+            results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+
+        df = open_backend(args.store, workdir).load()
+        writers = args.processes * args.threads
+        own = df[df["Buổi"] >= 1000]
+        lost_rows = writers * args.writes - len(own)
+        counted = int(df.loc[df["Buổi"] <= SHARED_SESSIONS, "Thời gian (phút)"].sum())
+        lost_increments = writers * args.writes - counted
+
+    print(f"{args.store}: {args.processes} process × {args.threads} thread, {2 * writers * args.writes} lần ghi trong {elapsed:.2f}s")
+    print(f"ghi riêng: mất {lost_rows} / {writers * args.writes} buổi")
+    print(f"tăng đếm: mất {lost_increments} / {writers * args.writes} lần, {sum(c for c, _ in results)} lần xung đột phải đọc lại")
+    slow = False
+    if args.store == "journal":
+        waits = np.concatenate([w for _, w in results]) * 1000
+        p50, p99 = np.percentile(waits, [50, 99])
+        slow = p99 > args.max_p99_ms
+        print(f"chờ khoá: p50 {p50:.1f} ms, p99 {p99:.1f} ms (giới hạn {args.max_p99_ms:.0f} ms), lâu nhất {waits.max():.1f} ms")
+    return 1 if lost_rows or lost_increments or slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# Bộ benchmark không cần Streamlit: sinh lịch sử giả ở nhiều cỡ, đo từng bước, ghi JSON.
+#   python benchmarks/suite.py --scales 1000 100000 10000000 -o bench_results.json
+#   python benchmarks/suite.py --scales 1000 --compare bench_results.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_scoring import synthetic_runs  # noqa: E402
+from charts import render_score_chart  # noqa: E402
+from history import build_history_table, plan_frame  # noqa: E402
+from scoring import score_frame  # noqa: E402
+from storage import COLUMNS, JournalStore, SqliteStore  # noqa: E402
+from training_load import compute_load  # noqa: E402
+
+UPSERTS = 100
+
+# load() của SQLite dựng cả bảng trong bộ nhớ (~1 GB ở 1 triệu dòng): cỡ lớn hơn chỉ đo khi yêu cầu
+SQLITE_MAX_ROWS = 1_000_000
+
+
+def synthetic_history(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = synthetic_runs(n, seed)
+    days = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 5 * 365, n)), unit="D")
+    df["Ngày chạy"] = days.strftime("%Y-%m-%d")
+    df["Thời gian (phút)"] = rng.integers(20, 150, n)
+    return score_frame(df)[COLUMNS]
+
+
+def timed(fn, repeat=1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_scale(n, workdir, sqlite=True):
+    repeat = 3 if n <= 100_000 else 1
+    df = synthetic_history(n)
+    results = {}
+
+    csv_path = os.path.join(workdir, f"data_{n}.csv")
+    df.to_csv(csv_path, index=False)
+    results["load.journal"] = timed(lambda: JournalStore(csv_path).load(), repeat)
+
+    results["score.score_frame"] = timed(lambda: score_frame(df), repeat)
+
+    journal = JournalStore(csv_path, compact_every=10 * UPSERTS)
+    journal.load()
+    rows = df.sample(UPSERTS, random_state=0).to_dict("records")
+
+    def upsert_journal():
+        for row in rows:
+            journal.upsert(row)
+            journal.load()
+
+    results["upsert.journal"] = timed(upsert_journal) / UPSERTS
+
+    if sqlite:
+        db_path = os.path.join(workdir, f"data_{n}.db")
+        store = SqliteStore(db_path, legacy_csv=None)
+        results["import.sqlite"] = timed(lambda: store.import_frame(df))
+        results["load.sqlite"] = timed(lambda: SqliteStore(db_path, legacy_csv=None).load(), repeat)
+        store.load()
+
+        def upsert_sqlite():
+            for row in rows:
+                store.upsert(row)
+                store.load()
+
+        results["upsert.sqlite"] = timed(upsert_sqlite) / UPSERTS
+
+    sessions = list(zip(df["Loại buổi"], [""] * n, [""] * n))
+    plan = plan_frame(sessions)
+    results["aggregate.history_table"] = timed(lambda: build_history_table(plan, df), repeat)
+    results["aggregate.training_load"] = timed(lambda: compute_load(df), repeat)
+
+    results["render.score_chart"] = timed(lambda: render_score_chart(df[["Buổi", "Tổng điểm"]]))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["rows"], r["stage"]): r["seconds"] for r in json.load(f)["results"]}
+    for r in report["results"]:
+        old = baseline.get((r["rows"], r["stage"]))
+        if old:
+            print(f"{r['rows']:>10} {r['stage']:<26} {old:.4f}s → {r['seconds']:.4f}s ({r['seconds'] / old:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1_000, 100_000, 10_000_000])
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--no-sqlite", action="store_true", help="bỏ qua các bước SQLite")
+    parser.add_argument("--sqlite-max-rows", type=int, default=SQLITE_MAX_ROWS,
+                        help=f"chỉ đo SQLite ở các cỡ không quá số dòng này (mặc định {SQLITE_MAX_ROWS:,})")
+    parser.add_argument("--compare", help="file JSON của lần chạy trước để so sánh")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.scales:
+            sqlite = not args.no_sqlite and n <= args.sqlite_max_rows
+            for stage, seconds in bench_scale(n, workdir, sqlite=sqlite).items():
+                report["results"].append({"rows": n, "stage": stage, "seconds": seconds})
+                print(f"{n:>10} {stage:<26} {seconds:.4f}s", flush=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import io
+import threading
+from collections import OrderedDict
+
+
+class ChartCache:
+    # Ảnh biểu đồ đã render (PNG/SVG bytes), khoá theo phiên bản dữ liệu + tham số, bỏ bớt theo LRU.
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0}
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hit"] += 1
+                return self._entries[key]
+            self.stats["miss"] += 1
+        image = render()
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return image
+
+
+def figure_bytes(fig, fmt="png"):
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format=fmt)
+    finally:
+        # giải phóng figure ngay sau khi render, không để tích lại trong process
+        fig.clear()
+    return buf.getvalue()
+
+
+def new_figure():
+    # matplotlib chỉ được import khi thật sự vẽ biểu đồ, không làm chậm lần chạy đầu của app.
+    # Figure tạo trực tiếp, không qua pyplot, nên không có figure nào bị giữ lại trong pyplot
+    from matplotlib.figure import Figure
+    return Figure()
+
+
+def render_score_chart(df, fmt="png", max_points=2000):
+    # lịch sử rất dài: lấy thưa lại như render_stream_chart, vẽ hàng triệu điểm đánh dấu thì không render nổi
+    df = df.sort_values("Buổi")
+    df = df.iloc[::max(1, len(df) // max_points)].astype(float)
+    fig = new_figure()
+    ax = fig.subplots()
+    ax.plot(df["Buổi"], df["Tổng điểm"], marker="o", linestyle="--")
+    ax.axhline(80, color='green', linestyle='--', label="Tốt")
+    ax.axhline(60, color='orange', linestyle='--', label="Trung bình")
+    ax.set_xlabel("Buổi chạy")
+    ax.set_ylabel("Tổng điểm")
+    ax.set_title("Biểu đồ hiệu quả luyện tập theo buổi")
+    ax.legend()
+    return figure_bytes(fig, fmt)
+
+
+def render_load_chart(series, fmt="png"):
+    fig = new_figure()
+    ax = fig.subplots()
+    ax.bar(series["Ngày"], series["TRIMP"], color='lightgray', label="TRIMP")
+    ax.plot(series["Ngày"], series["ATL"], color='red', label="ATL (7 ngày)")
+    ax.plot(series["Ngày"], series["CTL"], color='blue', label="CTL (42 ngày)")
+    ax.plot(series["Ngày"], series["TSB"], color='green', linestyle='--', label="TSB")
+    ax.set_ylabel("Tải")
+    ax.set_title("Tải tập luyện theo ngày")
+    ax.legend()
+    fig.autofmt_xdate()
+    return figure_bytes(fig, fmt)
+
+
+def render_stream_chart(frame, fmt="png", max_points=2000):
+    # vài nghìn mẫu mỗi buổi: lấy thưa lại trước khi vẽ, hình không khác mà render nhanh hơn
+    frame = frame.iloc[::max(1, len(frame) // max_points)].astype(float)
+    minutes = frame["Giây"] / 60
+    fig = new_figure()
+    ax = fig.subplots()
+    if "HR" in frame:
+        ax.plot(minutes, frame["HR"], color='red', label="HR")
+        ax.set_ylabel("HR")
+    ax.set_xlabel("Phút")
+    if "Pace (giây/km)" in frame:
+        pace_ax = ax.twinx()
+        pace_ax.plot(minutes, frame["Pace (giây/km)"] / 60, color='blue', alpha=0.6, label="Pace")
+        pace_ax.set_ylabel("Pace (min/km)")
+        pace_ax.invert_yaxis()
+    ax.set_title("HR và pace theo thời gian")
+    return figure_bytes(fig, fmt)
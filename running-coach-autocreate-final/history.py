@@ -0,0 +1,28 @@
+import pandas as pd
+
+PENDING = "⏳ Chưa nhập"
+
+
+def plan_frame(sessions):
+    return pd.DataFrame(
+        {
+            "Buổi": range(1, len(sessions) + 1),
+            "Loại buổi": [s[0] for s in sessions],
+            "Nội dung": [s[1] for s in sessions],
+            "Target HR Zone": [s[2] for s in sessions],
+        }
+    )
+
+
+def build_history_table(plan, results):
+    # Một phép merge kế hoạch ↔ kết quả theo "Buổi", thay cho việc lọc df cho từng buổi
+    done = (
+        results[["Buổi", "Đánh giá", "Tổng điểm"]]
+        .dropna(subset=["Buổi"])
+        .astype({"Buổi": "int64"})
+        .drop_duplicates("Buổi", keep="last")
+    )
+    table = plan[["Buổi", "Loại buổi"]].merge(done, on="Buổi", how="left", validate="one_to_one")
+    table["Đánh giá"] = table["Đánh giá"].astype(object).fillna(PENDING)
+    table["Tổng điểm"] = pd.to_numeric(table["Tổng điểm"], errors="coerce").astype("Int64")
+    return table
@@ -0,0 +1,143 @@
+# Nhập hàng loạt file hoạt động từ đồng hồ vào lịch sử: đọc file -> tóm tắt pace/HR/thời gian -> chấm điểm -> lưu,
+# kèm dữ liệu theo giây vào streams/. File được gán lần lượt cho các buổi chưa nhập theo thứ tự truyền vào;
+# mỗi buổi của kế hoạch (plan.py) nhận một file, hết buổi thì các file còn lại bị bỏ qua.
+#   python import_runs.py activities/*.gpx [--athlete ten] [--store sqlite] --workers 4
+import argparse
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from activity import read_activity
+from plan import sessions
+from scoring import ZONE_COLUMN, CompiledRules, load_rules
+from storage import athlete_path, open_store
+from streams import open_streams
+from targets import target_index
+from zones import HRProfile, zone_percent
+
+# cự ly thực tế được lệch bao nhiêu so với mục tiêu của buổi (khởi động, thả lỏng, sai số GPS)
+DISTANCE_TOLERANCE = 0.15
+
+
+def parse_file(path):
+    try:
+        return path, read_activity(path), None
+    except (ValueError, ImportError, ET.ParseError) as exc:
+        return path, None, str(exc)
+
+
+class SessionMatcher:
+    # Ưu tiên buổi chưa nhập có cự ly mục tiêu khớp với file, không có thì lấy buổi chưa nhập đầu tiên
+
+    def __init__(self, done, targets=None):
+        targets = target_index() if targets is None else targets
+        self.low = targets["Cự ly từ (m)"] * (1 - DISTANCE_TOLERANCE)
+        self.high = targets["Cự ly đến (m)"] * (1 + DISTANCE_TOLERANCE)
+        self.remaining = [b for b in targets.index if b not in done]
+
+    def match(self, distance):
+        if not self.remaining:
+            return None
+        fits = [b for b in self.remaining if self.low[b] <= distance <= self.high[b]]
+        buoi = (fits or self.remaining)[0]
+        self.remaining.remove(buoi)
+        return buoi
+
+
+def import_files(paths, store, streams=None, rules=None, workers=None, profile=None):
+    profile = profile or HRProfile()
+    targets = target_index(hr_edges=profile.edges())
+    history = store.load(["Buổi", "Ngày chạy", "Thời gian (phút)"])
+    # cùng ngày và cùng thời lượng với một buổi đã có -> coi là file đã nhập rồi
+    seen = set(zip(history["Ngày chạy"].dt.strftime("%Y-%m-%d"), history["Thời gian (phút)"].astype("Float64").fillna(-1)))
+    matcher = SessionMatcher(set(history["Buổi"].dropna().astype(int)), targets)
+    rows, skipped, samples_by_buoi = [], [], []
+
+    def handle(result):
+        path, parsed, error = result
+        if error:
+            skipped.append((path, error))
+            return
+        summary, samples = parsed
+        if (summary["Ngày chạy"], summary["Thời gian (phút)"]) in seen:
+            skipped.append((path, "đã nhập trước đó"))
+            return
+        buoi = matcher.match(summary["Cự ly (m)"])
+        if buoi is None:
+            skipped.append((path, "đã hết buổi trong kế hoạch"))
+            return
+        row = {c: summary[c] for c in ["Ngày chạy", "Pace", "HR", "SpO2 trước", "SpO2 sau", "Thời gian (phút)"]}
+        # đồng hồ không ghi RPE: để trống, quy tắc RPE không được tính khi chấm (scoring)
+        row.update({"Buổi": buoi, "Loại buổi": sessions[buoi - 1][0], "RPE": None})
+        row[ZONE_COLUMN] = zone_percent([samples], [buoi], profile, targets).iloc[0]
+        rows.append(row)
+        seen.add((summary["Ngày chạy"], summary["Thời gian (phút)"]))
+        samples_by_buoi.append((buoi, samples))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            handle(parse_file(path))
+    else:
+        # giữ tối đa 2 file/worker đang xử lý để bộ nhớ không tăng theo số file
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            for path in paths:
+                pending.append(pool.submit(parse_file, path))
+                if len(pending) >= workers * 2:
+                    handle(pending.popleft().result())
+            while pending:
+                handle(pending.popleft().result())
+
+    if not rows:
+        return pd.DataFrame(), skipped
+    # chấm cả lô một lần bằng cùng bộ quy tắc với app, rồi ghi một lần
+    scored = CompiledRules(rules or load_rules(), targets).score_frame(pd.DataFrame(rows))
+    store.upsert_many(scored.to_dict("records"))
+    # dữ liệu theo giây chỉ gắn vào buổi sau khi dòng của buổi đó đã ghi xong: ghi lỗi thì không để lại stream mồ côi
+    if streams is not None:
+        for buoi, samples in samples_by_buoi:
+            streams.save(buoi, samples)
+    return scored, skipped
+
+
+def remaining_sessions(store):
+    done = set(pd.to_numeric(store.load(["Buổi"])["Buổi"], errors="coerce").dropna().astype(int))
+    return len(set(range(1, len(sessions) + 1)) - done)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Nhập file GPX/TCX/FIT vào lịch sử luyện tập.",
+        epilog=f"Mỗi buổi trong kế hoạch ({len(sessions)} buổi) nhận một file: file trùng với buổi đã nhập và "
+               "file dư sau khi hết buổi chưa nhập sẽ bị bỏ qua.",
+    )
+    parser.add_argument("inputs", nargs="+", help="file hoạt động (.gpx, .tcx, .fit)")
+    parser.add_argument("--athlete", default=None, help="ghi vào athletes/<vận động viên>/")
+    parser.add_argument("--store", default=None, help="journal | sqlite")
+    parser.add_argument("--rules", default="rules.json", help="bảng ngưỡng (mặc định: rules.json nếu có)")
+    parser.add_argument("--workers", type=int, default=None, help="số process đọc file (mặc định: số CPU)")
+    args = parser.parse_args(argv)
+
+    store = open_store(args.store, athlete=args.athlete)
+    remaining = remaining_sessions(store)
+    if len(args.inputs) > remaining:
+        print(f"Kế hoạch chỉ còn {remaining} buổi chưa nhập cho {len(args.inputs)} file: "
+              "file trùng buổi đã nhập hoặc dư ra sẽ bị bỏ qua", file=sys.stderr)
+    start = time.perf_counter()
+    scored, skipped = import_files(args.inputs, store, open_streams(args.athlete),
+                                   load_rules(args.rules), args.workers, HRProfile.load(athlete_path(args.athlete, "hr_zones.json")))
+    for path, reason in skipped:
+        print(f"Bỏ qua {path}: {reason}", file=sys.stderr)
+    if len(scored):
+        print(scored[["Buổi", "Loại buổi", "Ngày chạy", "Pace", "HR", "Thời gian (phút)", ZONE_COLUMN, "Tổng điểm", "Đánh giá"]].to_string(index=False))
+    print(f"Đã nhập {len(scored)} buổi trong {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
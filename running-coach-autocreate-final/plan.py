@@ -0,0 +1,23 @@
+# Kế hoạch 16 buổi: (loại buổi, nội dung, vùng HR mục tiêu)
+sessions = [
+    ("Tempo", "5–8km @ pace 6:45", "Zone 3–4"),
+    ("Interval", "6x800m @ pace 6:30", "Zone 4–5"),
+    ("Long run", "10km @ pace 7:00–7:30", "Zone 2"),
+    ("Tempo", "6km @ pace 6:40", "Zone 3–4"),
+    ("Interval", "8x400m @ pace 6:20", "Zone 4–5"),
+    ("Long run", "12km @ pace 7:00", "Zone 2"),
+    ("Tempo", "7km @ pace 6:35", "Zone 3–4"),
+    ("Interval", "4x1km @ pace 6:25", "Zone 4–5"),
+    ("Long run", "14km @ pace 6:55", "Zone 2"),
+    ("Tempo", "8km @ pace 6:30", "Zone 3–4"),
+    ("Interval", "10x300m @ pace 6:10", "Zone 4–5"),
+    ("Long run", "16km @ pace 6:50", "Zone 2"),
+    ("Tempo", "9km @ pace 6:25", "Zone 3–4"),
+    ("Interval", "5x1km @ pace 6:20", "Zone 4–5"),
+    ("Long run", "18km @ pace 6:45", "Zone 2"),
+    ("Tempo", "10km @ pace 6:20", "Zone 3–4")
+]
+
+
+def session_types():
+    return {i + 1: buoi_type for i, (buoi_type, _, _) in enumerate(sessions)}
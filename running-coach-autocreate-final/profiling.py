@@ -0,0 +1,47 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+_NOOP = nullcontext()
+
+
+class Profiler:
+    # Đo thời gian từng bước của một lần rerun; khi tắt, stage() chỉ trả về một context rỗng.
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = []
+        self.counters = {}
+
+    def stage(self, name):
+        return self._timed(name) if self.enabled else _NOOP
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def count(self, name, value):
+        if self.enabled:
+            self.counters[name] = value
+
+    def total(self):
+        return sum(seconds for _, seconds in self.stages)
+
+    def record(self):
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "stages": {name: round(seconds * 1000, 3) for name, seconds in self.stages},
+            "total_ms": round(self.total() * 1000, 3),
+            "counters": self.counters,
+        }
+
+    def export(self, path="profile.jsonl"):
+        if not self.enabled:
+            return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.record(), ensure_ascii=False) + "\n")
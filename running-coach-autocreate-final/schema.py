@@ -0,0 +1,104 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+SESSION_TYPES = ["Tempo", "Interval", "Long run"]
+RATINGS = ["Tốt", "Trung bình", "Cần điều chỉnh"]
+
+# Trong bộ nhớ pace là số giây/km (số nguyên); trên đĩa, API và form vẫn là phút/km dạng thập phân
+PACE_SECONDS = "Pace (giây/km)"
+
+INT_DTYPES = {
+    "Buổi": "Int32",
+    "HR": "Int16",
+    "SpO2 trước": "Int16",
+    "SpO2 sau": "Int16",
+    "RPE": "Int8",
+    "Thời gian (phút)": "Int16",
+    "Tổng điểm": "Int16",
+    PACE_SECONDS: "Int16",
+}
+
+RATING_DTYPE = pd.CategoricalDtype(RATINGS)
+
+
+def pace_seconds(minutes):
+    return round(minutes * 60)
+
+def pace_minutes(seconds):
+    return seconds / 60
+
+_PACE_TEXT = re.compile(r"\s*(\d{1,2})(?::([0-5]\d))?\s*")
+
+def parse_pace(text):
+    # "6:45" (phút:giây, như trong kế hoạch) hoặc "7" -> 6.75 / 7.0 phút/km; "6.45" không nhận vì dễ nhầm với 6:45
+    match = _PACE_TEXT.fullmatch(text or "")
+    if not match:
+        return None
+    return int(match[1]) + int(match[2] or 0) / 60
+
+def format_pace(minutes):
+    seconds = pace_seconds(minutes)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _numbers(values):
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def _small_int(numbers, dtype):
+    # làm việc trên mảng numpy rồi dựng thẳng IntegerArray: rẻ cả khi chỉ có vài dòng (merge phần đuôi journal)
+    info = np.iinfo(dtype.lower())
+    with np.errstate(invalid="ignore"):
+        numbers = np.round(numbers)
+        # giá trị ngoài khoảng của kiểu số coi như không có, thay vì làm hỏng cả lần load
+        mask = ~((numbers >= info.min) & (numbers <= info.max))
+    return pd.arrays.IntegerArray(np.where(mask, 0, numbers).astype(dtype.lower()), mask)
+
+def _category(values, known):
+    if isinstance(values.dtype, pd.CategoricalDtype) and list(values.cat.categories[:len(known)]) == known:
+        return values
+    present = pd.unique(values.dropna().astype(str).to_numpy())
+    return pd.Categorical(values, categories=known + sorted(set(present) - set(known)))
+
+
+def typed(frame):
+    # Lịch sử dạng thô (chuỗi/float từ CSV hay SQLite) -> kiểu gọn: category, số nguyên nhỏ, datetime
+    out = {}
+    for c in frame.columns:
+        values = frame[c]
+        if c == "Pace":
+            out[PACE_SECONDS] = _small_int(_numbers(values) * 60, INT_DTYPES[PACE_SECONDS])
+        elif c == "Ngày chạy":
+            out[c] = values if values.dtype.kind == "M" else pd.to_datetime(values, errors="coerce", format="ISO8601")
+        elif c == "Loại buổi":
+            out[c] = _category(values, SESSION_TYPES)
+        elif c == "Đánh giá":
+            out[c] = values if values.dtype == RATING_DTYPE else pd.Categorical(values, dtype=RATING_DTYPE)
+        elif c in INT_DTYPES:
+            out[c] = values if values.dtype == INT_DTYPES[c] else _small_int(_numbers(values), INT_DTYPES[c])
+        else:
+            out[c] = values
+    return pd.DataFrame(out, index=frame.index)
+
+def untyped(frame):
+    # Ngược lại typed(): pace về phút/km, ngày về chuỗi ISO, dùng để trả ra ngoài (API, file)
+    out = {}
+    for c in frame.columns:
+        values = frame[c]
+        if c == PACE_SECONDS:
+            out["Pace"] = pace_minutes(values.astype("Float64"))
+        elif c == "Ngày chạy" and values.dtype.kind == "M":
+            out[c] = values.dt.strftime("%Y-%m-%d")
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            out[c] = values.astype(object)
+        else:
+            out[c] = values
+    return pd.DataFrame(out, index=frame.index).astype(object).where(lambda df: df.notna(), None)
+
+def concat(frames):
+    out = pd.concat(frames, ignore_index=True)
+    # hai khối có bộ loại buổi khác nhau thì pandas trả về object; đưa về category lại
+    if "Loại buổi" in out and not isinstance(out["Loại buổi"].dtype, pd.CategoricalDtype):
+        out["Loại buổi"] = _category(out["Loại buổi"], SESSION_TYPES)
+    return out
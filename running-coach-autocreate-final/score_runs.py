@@ -0,0 +1,87 @@
+# Chấm điểm hàng loạt không cần giao diện Streamlit.
+#   python score_runs.py runs.csv [runs2.csv ...] -o scored.csv --workers 4
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from plan import session_types
+from scoring import CompiledRules, load_rules
+
+_engine = None
+
+
+def _init_worker(rules):
+    global _engine
+    _engine = CompiledRules(rules)
+
+
+def score_chunk(chunk):
+    # Loại buổi lấy từ cột "Loại buổi", thiếu thì suy ra từ số buổi trong kế hoạch
+    types = chunk["Loại buổi"] if "Loại buổi" in chunk else pd.Series(pd.NA, index=chunk.index, dtype=object)
+    if "Buổi" in chunk:
+        types = types.fillna(pd.to_numeric(chunk["Buổi"], errors="coerce").map(session_types()))
+    scored = _engine.score_frame(chunk, types)
+    scored["Loại buổi"] = types
+    return scored
+
+
+def read_chunks(paths, chunksize):
+    for path in paths:
+        with pd.read_csv(path, chunksize=chunksize) as reader:
+            yield from reader
+
+
+def score_files(paths, output, rules, workers=None, chunksize=200_000):
+    workers = workers or os.cpu_count() or 1
+    rows = 0
+    columns = None
+    with open(output, "w", newline="", encoding="utf-8") as out:
+        def write(scored):
+            # các file đầu vào có thể khác cột: giữ bộ cột của chunk đầu tiên
+            nonlocal rows, columns
+            if columns is None:
+                columns = list(scored.columns)
+                scored.to_csv(out, index=False)
+            else:
+                scored.reindex(columns=columns).to_csv(out, index=False, header=False)
+            rows += len(scored)
+
+        if workers == 1:
+            _init_worker(rules)
+            for chunk in read_chunks(paths, chunksize):
+                write(score_chunk(chunk))
+            return rows
+
+        # giữ tối đa 2 chunk/worker đang xử lý để bộ nhớ không tăng theo kích thước file
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(rules,)) as pool:
+            pending = deque()
+            for chunk in read_chunks(paths, chunksize):
+                pending.append(pool.submit(score_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chấm điểm các file nhật ký chạy (CSV).")
+    parser.add_argument("inputs", nargs="+", help="file CSV đầu vào")
+    parser.add_argument("-o", "--output", required=True, help="file CSV kết quả")
+    parser.add_argument("--rules", default="rules.json", help="bảng ngưỡng (mặc định: rules.json nếu có)")
+    parser.add_argument("--workers", type=int, default=None, help="số process (mặc định: số CPU)")
+    parser.add_argument("--chunksize", type=int, default=200_000, help="số dòng mỗi chunk")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = score_files(args.inputs, args.output, load_rules(args.rules), args.workers, args.chunksize)
+    print(f"Đã chấm {rows} dòng trong {time.perf_counter() - start:.1f}s → {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import json
+import operator
+import os
+
+import numpy as np
+import pandas as pd
+
+from schema import PACE_SECONDS, RATINGS, pace_seconds
+from storage import atomic_open
+from targets import target_deviations, target_index, target_table, type_table
+
+# Loại buổi không có trong bảng quy tắc được chấm như Long run
+DEFAULT_TYPE = "Long run"
+
+# Mỗi quy tắc: (điểm, [(chỉ số, phép so sánh, ngưỡng), ...]); cộng điểm khi mọi điều kiện đều đúng.
+# "Lệch pace mục tiêu"/"Lệch HR mục tiêu": số giây/km, số nhịp lệch khỏi mục tiêu ghi trong kế hoạch của buổi đó
+# (HR theo vùng của buổi, tính từ vùng HR riêng của vận động viên khi có);
+# dòng không có số buổi thì so với khoảng pace/HR chung của loại buổi trong kế hoạch.
+# Quy tắc dùng chỉ số bị trống (file đồng hồ không có RPE/SpO2) không được tính: điểm quy đổi theo tổng điểm
+# của các quy tắc còn lại, thay vì mất trắng phần điểm đó.
+RULES = {
+    "Tempo": [
+        (30, [("Lệch HR mục tiêu", "<=", 5)]),
+        (30, [("RPE", ">=", 4), ("RPE", "<=", 6)]),
+        (30, [("Lệch pace mục tiêu", "<=", 10)]),
+        (10, [("SpO2 sau", ">=", 94)]),
+    ],
+    "Interval": [
+        (35, [("Lệch HR mục tiêu", "<=", 5)]),
+        (35, [("RPE", ">=", 7), ("RPE", "<=", 9)]),
+        (20, [("SpO2 sau", ">=", 93), ("Giảm SpO2", "<=", 3)]),
+        (10, [("Lệch pace mục tiêu", "<=", 10)]),
+    ],
+    "Long run": [
+        (30, [("Lệch HR mục tiêu", "<=", 5)]),
+        (30, [("SpO2 sau", ">=", 94), ("|Giảm SpO2|", "<=", 2)]),
+        (30, [("RPE", ">=", 3), ("RPE", "<=", 5)]),
+        (10, [("Lệch pace mục tiêu", "<=", 10)]),
+    ],
+}
+
+# Buổi có dữ liệu HR theo giây: điểm = 80% điểm quy tắc + 20% × % thời gian nằm trong vùng HR mục tiêu (zones.py).
+# Cột này không lưu vào lịch sử, người gọi tính từ stream và gắn vào dòng trước khi chấm.
+ZONE_COLUMN = "% thời gian đúng vùng"
+ZONE_WEIGHT = 0.2
+
+OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+RULE_COLUMNS = ["Loại buổi", "Quy tắc", "Điểm", "Chỉ số", "Phép so sánh", "Ngưỡng"]
+
+
+# Pace được so sánh theo số giây/km nguyên; ngưỡng phút/km đổi sang giây khi dịch quy tắc.
+def _threshold(metric, value):
+    value = float(value)
+    # làm tròn phần sai số float (6.45 * 60 = 387.00000000000006) để so sánh với giây nguyên là chính xác
+    return round(value * 60, 6) if metric == "Pace" else value
+
+def _metrics_row(row, table, window):
+    metrics = dict(row)
+    pace = row.get("Pace")
+    if pace is None or pd.isna(pace):
+        pace = row.get(PACE_SECONDS)
+        metrics["Pace"] = np.nan if pace is None or pd.isna(pace) else int(pace)
+    else:
+        metrics["Pace"] = pace_seconds(pace)
+    metrics["Giảm SpO2"] = row["SpO2 trước"] - row["SpO2 sau"]
+    metrics["|Giảm SpO2|"] = abs(metrics["Giảm SpO2"])
+    buoi = row.get("Buổi")
+    deviations = target_deviations([np.nan if buoi is None else buoi], [metrics["Pace"]], [row.get("HR", np.nan)], table, window[None, :])
+    metrics.update({name: values[0] for name, values in deviations.items()})
+    return metrics
+
+def _col(df, name):
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def _metrics_frame(df, table, windows):
+    metrics = {name: _col(df, name) for name in ["HR", "RPE", "SpO2 trước", "SpO2 sau"]}
+    metrics["Pace"] = _col(df, PACE_SECONDS) if PACE_SECONDS in df else np.round(_col(df, "Pace") * 60)
+    metrics["Giảm SpO2"] = metrics["SpO2 trước"] - metrics["SpO2 sau"]
+    metrics["|Giảm SpO2|"] = np.abs(metrics["Giảm SpO2"])
+    buoi = _col(df, "Buổi") if "Buổi" in df else np.full(len(df), np.nan)
+    metrics.update(target_deviations(buoi, metrics["Pace"], metrics["HR"], table, windows))
+    return metrics
+
+def _rescale(scores, available, total):
+    # điểm đạt được trên phần quy tắc chấm được -> thang của cả bảng quy tắc
+    scores = np.asarray(scores)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scaled = np.where(available > 0, np.round(scores * total / np.maximum(available, 1)), 0)
+    return np.where(available == total, scores, scaled).astype(np.int64)
+
+def _with_zone(scores, percent):
+    # không có dữ liệu theo giây (NaN) -> giữ nguyên điểm quy tắc
+    percent = np.asarray(percent, dtype=float)
+    blended = np.round((1 - ZONE_WEIGHT) * scores + ZONE_WEIGHT * np.nan_to_num(percent))
+    return np.where(np.isnan(percent), scores, blended).astype(np.int64)
+
+def rate_array(scores):
+    codes = np.where(scores >= 80, 0, np.where(scores >= 60, 1, 2))
+    return pd.Categorical.from_codes(codes, categories=RATINGS)
+
+
+class CompiledRules:
+    # Bảng quy tắc đã được dịch sẵn thành các phép so sánh, dùng cho một dòng hoặc cả DataFrame.
+    # targets: mục tiêu từng buổi đã phân tích từ kế hoạch (targets.target_index), mặc định là kế hoạch trong plan.py.
+
+    def __init__(self, rules, targets=None):
+        self.rules = rules
+        self.targets = target_index() if targets is None else targets
+        self._target_table = target_table(self.targets)
+        self._type_windows = type_table(self.targets)
+        self._compiled = {
+            buoi_type: [
+                (points, [(metric, OPS[op], _threshold(metric, value)) for metric, op, value in conditions])
+                for points, conditions in type_rules
+            ]
+            for buoi_type, type_rules in rules.items()
+        }
+
+    def _rules_for(self, buoi_type):
+        return self._compiled.get(buoi_type, self._compiled[DEFAULT_TYPE])
+
+    def _window_for(self, buoi_type):
+        # loại buổi chấm như Long run thì cũng so với mục tiêu của Long run
+        buoi_type = buoi_type if buoi_type in self._compiled else DEFAULT_TYPE
+        return self._type_windows.get(buoi_type, np.full(4, np.nan))
+
+    def score_row(self, buoi_type, row):
+        metrics = _metrics_row(row, self._target_table, self._window_for(buoi_type))
+        score = available = total = 0
+        for points, conditions in self._rules_for(buoi_type):
+            total += points
+            if any(pd.isna(metrics[metric]) for metric, _, _ in conditions):
+                continue
+            available += points
+            if all(op(metrics[metric], value) for metric, op, value in conditions):
+                score += points
+        score = int(_rescale(score, available, total))
+        percent = row.get(ZONE_COLUMN)
+        return score if percent is None or pd.isna(percent) else int(_with_zone(score, percent))
+
+    def score_types(self, df, types):
+        types = np.asarray(types, dtype=object)
+        known = [t for t in self._compiled if t != DEFAULT_TYPE]
+        masks = {t: types == t for t in known}
+        masks[DEFAULT_TYPE] = np.ones(len(types), dtype=bool)
+        for t in known:
+            masks[DEFAULT_TYPE] &= ~masks[t]
+        scores = np.zeros(len(types), dtype=np.int64)
+        available = np.zeros(len(types), dtype=np.int64)
+        total = np.zeros(len(types), dtype=np.int64)
+        windows = np.empty((len(types), 4))
+        for buoi_type, type_mask in masks.items():
+            windows[type_mask] = self._window_for(buoi_type)
+        with np.errstate(invalid="ignore"):
+            metrics = _metrics_frame(df, self._target_table, windows)
+            for buoi_type, type_mask in masks.items():
+                if not type_mask.any():
+                    continue
+                for points, conditions in self._compiled[buoi_type]:
+                    known = type_mask.copy()
+                    hit = type_mask.copy()
+                    for metric, op, value in conditions:
+                        known &= ~np.isnan(metrics[metric])
+                        hit &= op(metrics[metric], value)
+                    total += points * type_mask
+                    available += points * known
+                    scores += points * (hit & known)
+        scores = _rescale(scores, available, total)
+        if ZONE_COLUMN in df:
+            scores = _with_zone(scores, _col(df, ZONE_COLUMN))
+        return scores
+
+    def score_frame(self, df, types=None):
+        if types is None:
+            types = df["Loại buổi"]
+        scores = self.score_types(df, types)
+        out = df.copy()
+        out["Tổng điểm"] = scores
+        out["Đánh giá"] = rate_array(scores)
+        return out
+
+
+DEFAULT_ENGINE = CompiledRules(RULES)
+
+
+def score_tempo(row):
+    return DEFAULT_ENGINE.score_row("Tempo", row)
+
+def score_interval(row):
+    return DEFAULT_ENGINE.score_row("Interval", row)
+
+def score_longrun(row):
+    return DEFAULT_ENGINE.score_row("Long run", row)
+
+def score_session(buoi_type, row):
+    return DEFAULT_ENGINE.score_row(buoi_type, row)
+
+def rate(score):
+    if score >= 80: return "Tốt"
+    elif score >= 60: return "Trung bình"
+    else: return "Cần điều chỉnh"
+
+def score_frame(df, types=None):
+    # Chấm điểm toàn bộ lịch sử; types mặc định lấy từ cột "Loại buổi"
+    return DEFAULT_ENGINE.score_frame(df, types)
+
+
+def rules_to_frame(rules):
+    return pd.DataFrame([
+        {"Loại buổi": buoi_type, "Quy tắc": i + 1, "Điểm": points, "Chỉ số": metric, "Phép so sánh": op, "Ngưỡng": value}
+        for buoi_type, type_rules in rules.items()
+        for i, (points, conditions) in enumerate(type_rules)
+        for metric, op, value in conditions
+    ], columns=RULE_COLUMNS)
+
+def rules_from_frame(table):
+    rules = {}
+    for (buoi_type, _), group in table.groupby(["Loại buổi", "Quy tắc"], sort=False):
+        conditions = [(r["Chỉ số"], r["Phép so sánh"], float(r["Ngưỡng"])) for r in group.to_dict("records")]
+        rules.setdefault(buoi_type, []).append((int(group["Điểm"].iloc[0]), conditions))
+    return rules
+
+def load_rules(path="rules.json"):
+    if not os.path.exists(path):
+        return RULES
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    return {
+        buoi_type: [(points, [tuple(c) for c in conditions]) for points, conditions in type_rules]
+        for buoi_type, type_rules in saved.items()
+    }
+
+def save_rules(rules, path="rules.json"):
+    with atomic_open(path) as f:
+        json.dump(rules, f, ensure_ascii=False, indent=2)
+
+def changed_types(old_rules, new_rules):
+    return {t for t in set(old_rules) | set(new_rules) if old_rules.get(t) != new_rules.get(t)}
+
+def rescore(df, types, rules, only_types, targets=None):
+    # Chấm lại các dòng thuộc loại buổi có quy tắc thay đổi; trả về những dòng có điểm khác trước.
+    # targets: mục tiêu theo vùng HR của vận động viên; df có thể kèm cột ZONE_COLUMN
+    types = pd.Series(np.asarray(types, dtype=object), index=df.index)
+    affected = types.isin(only_types)
+    if DEFAULT_TYPE in only_types:
+        affected |= ~types.isin(list(rules))
+    if not affected.any():
+        return df.iloc[0:0]
+    subset = df[affected]
+    scored = CompiledRules(rules, targets).score_frame(subset, types[affected])
+    changed = (scored["Tổng điểm"].to_numpy() != pd.to_numeric(subset["Tổng điểm"], errors="coerce").to_numpy()) | (
+        scored["Đánh giá"].astype(object).to_numpy() != subset["Đánh giá"].astype(object).to_numpy()
+    )
+    return scored[changed]
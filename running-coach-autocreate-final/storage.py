@@ -0,0 +1,605 @@
+import csv
+import io
+import os
+import sqlite3
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
+from contextlib import closing, contextmanager
+
+import pandas as pd
+
+from schema import PACE_SECONDS, concat, pace_minutes, pace_seconds, typed
+
+try:
+    import fcntl
+except ImportError:  # Windows: không có flock, chỉ còn khoá giữa các thread trong cùng process
+    fcntl = None
+
+COLUMNS = ["Buổi", "Ngày chạy", "Loại buổi", "Pace", "HR", "SpO2 trước", "SpO2 sau", "RPE", "Thời gian (phút)", "Tổng điểm", "Đánh giá"]
+
+# Số bản ghi trong journal trước khi gộp lại vào data.csv
+COMPACT_EVERY = 500
+
+# Chờ khoá ghi lâu hơn mức này thì báo lỗi thay vì treo cả phiên
+LOCK_TIMEOUT = 10.0
+
+# Số lần chờ khoá gần nhất được giữ lại để xem phân bố (p99), không chỉ lần lâu nhất
+WAIT_HISTORY = 1000
+
+# Nhập cả bảng vào SQLite theo từng khúc chừng này dòng: bộ nhớ không tăng theo cỡ lịch sử
+IMPORT_CHUNK = 50_000
+
+# upsert(row) không truyền expected: ghi đè, không kiểm tra phiên bản
+UNCHECKED = object()
+
+
+class ConflictError(Exception):
+    # Dòng của buổi đã bị phiên khác sửa kể từ lúc người dùng đọc nó
+    pass
+
+
+class FileLock:
+    # Khoá ghi giữa các process (flock trên file .lock), cũng loại trừ lẫn nhau giữa các thread vì mỗi lần giữ mở fd riêng.
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._thread_lock = threading.Lock() if fcntl is None else None
+        self.max_wait = 0.0
+        self.waits = deque(maxlen=WAIT_HISTORY)
+
+    def _waited(self, start):
+        wait = time.monotonic() - start
+        self.waits.append(wait)
+        self.max_wait = max(self.max_wait, wait)
+
+    @contextmanager
+    def hold(self):
+        start = time.monotonic()
+        if fcntl is None:
+            if not self._thread_lock.acquire(timeout=self.timeout):
+                raise TimeoutError(f"Không lấy được khoá {self.path} sau {self.timeout:.0f}s")
+            try:
+                self._waited(start)
+                yield
+            finally:
+                self._thread_lock.release()
+            return
+        with open(self.path, "a") as f:
+            delay = 0.0005
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() - start > self.timeout:
+                        raise TimeoutError(f"Không lấy được khoá {self.path} sau {self.timeout:.0f}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.005)
+            self._waited(start)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def empty_frame(columns=None):
+    return pd.DataFrame(columns=list(columns or COLUMNS))
+
+
+def storage_row(row):
+    # Một dòng (từ form, API hoặc từ lịch sử đã typed) về dạng ghi ra đĩa: pace phút/km, ngày ISO, None cho ô trống
+    values = {}
+    for c in COLUMNS:
+        v = row.get(c)
+        if c == "Pace" and v is None and row.get(PACE_SECONDS) is not None:
+            v = row[PACE_SECONDS]
+            v = None if pd.isna(v) else pace_minutes(int(v))
+        if v is not None and not isinstance(v, str) and pd.isna(v):
+            v = None
+        elif hasattr(v, "isoformat"):
+            v = v.isoformat()[:10]
+        elif hasattr(v, "item"):
+            v = v.item()
+        values[c] = v
+    return values
+
+
+def canonical_row(row):
+    # Dạng chuẩn để so sánh: số về float, pace về giây nguyên như typed(), nên bản thô và bản typed của cùng một dòng là như nhau
+    if row is None:
+        return None
+    values = storage_row(row)
+    for c, v in values.items():
+        if v is None or isinstance(v, str):
+            continue
+        values[c] = pace_seconds(float(v)) if c == "Pace" else float(v)
+    return values
+
+def check_expected(current, expected, buoi):
+    if canonical_row(current) != canonical_row(expected):
+        raise ConflictError(f"Buổi #{buoi} đã được cập nhật ở phiên khác")
+
+
+def session_of(frame, buoi):
+    match = frame[frame["Buổi"] == buoi]
+    return None if match.empty else match.iloc[-1].to_dict()
+
+
+@contextmanager
+def atomic_open(path):
+    # ghi ra file tạm rồi rename: người đọc chỉ thấy bản cũ hoặc bản mới hoàn chỉnh;
+    # ghi hỏng giữa chừng thì bỏ file tạm, file cũ giữ nguyên
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_atomic(frame, path):
+    with atomic_open(path) as f:
+        frame.to_csv(f, index=False)
+
+
+def snapshot(frame, columns=None):
+    # view nông, không chép dữ liệu; nhờ copy-on-write, sửa trên view không làm hỏng bản trong store
+    return frame.copy(deep=False) if columns is None else frame[list(columns)]
+
+
+def merge_tail(frame, tail):
+    # các buổi có trong tail thay cho bản cũ, không phải đọc lại toàn bộ lịch sử
+    tail = typed(tail.drop_duplicates("Buổi", keep="last").reindex(columns=COLUMNS))
+    kept = frame[~frame["Buổi"].isin(tail["Buổi"])]
+    if kept.empty:
+        return tail.reset_index(drop=True)
+    return concat([kept, tail])
+
+
+class JournalStore:
+    # data.csv là bản đã gộp; mỗi lần lưu chỉ ghi thêm một dòng vào data.journal.csv.
+    # Khi journal đủ dài, một thread nền gộp các bản ghi bị thay thế vào data.csv.
+
+    def __init__(self, path="data.csv", compact_every=COMPACT_EVERY):
+        self.path = path
+        self.journal_path = path.replace(".csv", "") + ".journal.csv"
+        self.compacting_path = self.journal_path + ".compacting"
+        self.compact_every = compact_every
+        # _lock chỉ bảo vệ bản gộp trong bộ nhớ (load có thể đọc lại cả file); không lấy nó khi đang giữ file_lock,
+        # nếu không người ghi phải chờ cả lần đọc đó. _pending và các file chỉ đổi khi giữ file_lock.
+        self._lock = threading.Lock()
+        # khoá ghi dùng chung với các process khác cùng thư mục dữ liệu (app, API, script)
+        self.file_lock = FileLock(path + ".lock")
+        self._compactor = None
+        if not os.path.exists(self.path):
+            with self.file_lock.hold():
+                if not os.path.exists(self.path):
+                    write_atomic(empty_frame(), self.path)
+        self._pending = self._count_records(self.journal_path)
+        # bản gộp trong bộ nhớ + vị trí đã đọc tới trong journal
+        self._frame = None
+        self._base_sig = None
+        self._journal_id = None
+        self._offset = 0
+        # số lần load: dùng lại bản trong bộ nhớ / chỉ đọc phần mới / đọc lại toàn bộ
+        self.stats = {"hit": 0, "tail": 0, "full": 0}
+
+    def _count_records(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_csv(path)
+        except pd.errors.EmptyDataError:
+            return None
+
+    def _fold(self, frames):
+        frames = [f for f in frames if f is not None and not f.empty]
+        if not frames:
+            return empty_frame()
+        df = pd.concat(frames, ignore_index=True)
+        # bản ghi sau cùng của mỗi buổi là bản hợp lệ
+        return df.drop_duplicates("Buổi", keep="last").reset_index(drop=True).reindex(columns=COLUMNS)
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def version(self):
+        return (self._stat(self.path), self._stat(self.compacting_path), self._stat(self.journal_path))
+
+    def _read_journal(self, offset, journal_id):
+        # chỉ đọc tới dòng hoàn chỉnh cuối cùng, phần đang ghi dở để lần sau
+        with open(self.journal_path, "rb") as f:
+            if os.fstat(f.fileno()).st_ino != journal_id:
+                # journal vừa được một process khác đưa đi gộp, file ở đường dẫn này đã là file mới
+                return None, None
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return None, offset
+        header = 0 if offset == 0 else None
+        tail = pd.read_csv(io.BytesIO(data[:end]), header=header, names=None if header == 0 else COLUMNS)
+        return tail, offset + end
+
+    def _refresh(self):
+        # Đọc không cần khoá ghi; trả về False nếu các file bị gộp/thay giữa chừng để load() đọc lại
+        base_sig, compacting_sig, journal_sig = self.version()
+        journal_id = journal_sig[0] if journal_sig else None
+        journal_size = journal_sig[2] if journal_sig else 0
+        stale = (
+            self._frame is None
+            or (base_sig, compacting_sig) != self._base_sig
+            or (self._offset and journal_id != self._journal_id)
+            or journal_size < self._offset
+        )
+        if stale:
+            frames = [self._read(self.path), self._read(self.compacting_path)]
+            offset = 0
+            if journal_sig:
+                tail, offset = self._read_journal(0, journal_id)
+                frames.append(tail)
+            if offset is None or (self._stat(self.path), self._stat(self.compacting_path)) != (base_sig, compacting_sig):
+                return False
+            self._frame = typed(self._fold(frames))
+            self._base_sig = (base_sig, compacting_sig)
+            self._offset = offset
+            self.stats["full"] += 1
+        elif journal_size > self._offset:
+            tail, offset = self._read_journal(self._offset, journal_id)
+            if offset is None:
+                return False
+            if tail is not None:
+                self._frame = merge_tail(self._frame, tail)
+            self._offset = offset
+            self.stats["tail"] += 1
+        else:
+            self.stats["hit"] += 1
+        self._journal_id = journal_id
+        return True
+
+    def _current(self):
+        # bản gộp mới nhất kèm vị trí đã đọc tới (phiên bản data.csv/.compacting, journal, offset)
+        with self._lock:
+            while True:
+                try:
+                    if self._refresh():
+                        break
+                except FileNotFoundError:
+                    # file .compacting/journal vừa bị xoá hoặc đổi tên bởi process khác
+                    pass
+            return self._frame, (self._base_sig, self._journal_id, self._offset)
+
+    def load(self, columns=None):
+        return snapshot(self._current()[0], columns)
+
+    def get(self, buoi):
+        return session_of(self.load(), buoi)
+
+    def _journal_columns(self):
+        try:
+            with open(self.journal_path, newline="", encoding="utf-8") as f:
+                return next(csv.reader(f), None)
+        except FileNotFoundError:
+            return None
+
+    def _migrate_journal(self):
+        # journal ghi theo bộ cột cũ (trước khi thêm "Loại buổi", "Thời gian (phút)"...): viết lại theo COLUMNS
+        # trước khi ghi thêm, nếu không các dòng mới sẽ lệch cột với header. Gọi khi đang giữ khoá ghi.
+        header = self._journal_columns()
+        if header is None or header == COLUMNS:
+            return
+        old = self._read(self.journal_path)
+        write_atomic(empty_frame() if old is None else old.reindex(columns=COLUMNS), self.journal_path)
+
+    def _written_since(self, position, sessions):
+        # Các buổi trong sessions được ghi vào journal sau position. Gọi khi đang giữ khoá ghi: chỉ stat và đọc thô
+        # phần journal ghi thêm từ đó, không đọc/gộp lịch sử. None nếu file đã bị gộp/thay giữa chừng.
+        base_sig, journal_id, offset = position
+        current, compacting_sig, journal_sig = self.version()
+        if (current, compacting_sig) != base_sig:
+            return None
+        if journal_sig is None:
+            return None if offset else set()
+        if offset and journal_sig[0] != journal_id:
+            return None
+        if journal_sig[2] == offset:
+            return set()
+        with open(self.journal_path, "rb") as f:
+            f.seek(offset)
+            lines = f.read().decode("utf-8").splitlines()
+        written = {float(r[0]) for r in csv.reader(lines[1:] if offset == 0 else lines) if r and r[0]}
+        return written & sessions
+
+    def upsert_many(self, rows, expected=None):
+        # expected: {buổi: dòng người dùng đã thấy, None nếu lúc đó chưa có}; lệch với bản hiện tại -> ConflictError, không ghi gì.
+        # So với expected trước khi lấy khoá ghi (có thể phải đọc lại cả lịch sử sau khi gộp); trong khoá chỉ còn
+        # xem từ lúc đó có ai ghi vào các buổi này chưa: có -> ConflictError, journal vừa bị gộp/thay -> nhả khoá, so lại.
+        start = time.monotonic()
+        while True:
+            if expected:
+                frame, position = self._current()
+                for buoi, seen in expected.items():
+                    check_expected(session_of(frame, buoi), seen, buoi)
+            with self.file_lock.hold():
+                self._migrate_journal()
+                if expected:
+                    written = self._written_since(position, {float(b) for b in expected})
+                    if written is None:
+                        # dữ liệu chỉ được gộp chứ không đổi: so lại, như chờ khoá thì không quá LOCK_TIMEOUT
+                        if time.monotonic() - start > self.file_lock.timeout:
+                            raise TimeoutError(f"Dữ liệu {self.path} đang được gộp lại, chưa ghi được")
+                        continue
+                    if written:
+                        raise ConflictError(f"Buổi #{int(min(written))} đã được cập nhật ở phiên khác")
+                new_file = not os.path.exists(self.journal_path)
+                with open(self.journal_path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    if new_file:
+                        writer.writerow(COLUMNS)
+                    for row in rows:
+                        writer.writerow(storage_row(row).values())
+                        self._pending += 1
+                should_compact = self._pending >= self.compact_every
+            break
+        if should_compact:
+            self.compact_async()
+
+    def upsert(self, row, expected=UNCHECKED):
+        self.upsert_many([row], None if expected is UNCHECKED else {row["Buổi"]: expected})
+
+    def compact_async(self):
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        with self.file_lock.hold():
+            if os.path.exists(self.journal_path) and not os.path.exists(self.compacting_path):
+                # lần lưu mới sẽ ghi vào một journal trống trong lúc gộp
+                os.replace(self.journal_path, self.compacting_path)
+            self._pending = 0
+            compacting_sig = self._stat(self.compacting_path)
+        if compacting_sig is None:
+            return
+        # gộp ngoài khoá để người ghi không phải chờ; chỉ giữ khoá lúc thay file
+        df = self._fold([self._read(self.path), self._read(self.compacting_path)])
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_csv(tmp_path, index=False)
+        with self.file_lock.hold():
+            if self._stat(self.compacting_path) != compacting_sig:
+                # dữ liệu đã bị reset, hoặc một tiến trình khác đã gộp xong trong lúc này
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self.path)
+            os.remove(self.compacting_path)
+
+    def reset(self):
+        with self.file_lock.hold():
+            for path in (self.journal_path, self.compacting_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            write_atomic(empty_frame(), self.path)
+            self._pending = 0
+
+
+class SqliteStore:
+    # Mỗi buổi là một dòng, khoá chính "Buổi" nên lưu lại chỉ là một lệnh upsert.
+    # Mỗi lần ghi tăng "generation"; dòng được ghi mang số đó trong cột _gen để đọc phần mới.
+
+    def __init__(self, path="data.db", legacy_csv="data.csv"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._frame = None
+        self._version = None
+        self.stats = {"hit": 0, "tail": 0, "full": 0}
+        with closing(self._connect()) as conn, conn:
+            cols = ", ".join(
+                f'"{c}" INTEGER PRIMARY KEY' if c == "Buổi" else f'"{c}"' for c in COLUMNS
+            )
+            conn.execute(f"CREATE TABLE IF NOT EXISTS runs ({cols}, _gen INTEGER NOT NULL DEFAULT 0)")
+            existing = [r[1] for r in conn.execute("PRAGMA table_info(runs)")]
+            for c in COLUMNS:
+                if c not in existing:
+                    conn.execute(f'ALTER TABLE runs ADD COLUMN "{c}"')
+            if "_gen" not in existing:
+                conn.execute("ALTER TABLE runs ADD COLUMN _gen INTEGER NOT NULL DEFAULT 0")
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_runs_ngay ON runs ("Ngày chạy")')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_runs_loai ON runs ("Loại buổi")')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_gen ON runs (_gen)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('epoch', 0), ('generation', 0)")
+            empty = conn.execute("SELECT 1 FROM runs LIMIT 1").fetchone() is None
+        if empty and legacy_csv and os.path.exists(legacy_csv):
+            self.upsert_many(JournalStore(legacy_csv).load().to_dict("records"))
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _values(self, row):
+        return list(storage_row(row).values())
+
+    def _bump(self, conn, key):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = ?", (key,))
+        return conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def version(self):
+        with closing(self._connect()) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        return (meta["epoch"], meta["generation"])
+
+    def _row(self, conn, buoi):
+        df = self._query(conn, COLUMNS, 'WHERE "Buổi" = ?', (int(buoi),))
+        return None if df.empty else df.iloc[0].to_dict()
+
+    def _upsert_sql(self):
+        names = ", ".join(f'"{c}"' for c in COLUMNS)
+        params = ", ".join("?" for _ in COLUMNS)
+        updates = ", ".join(f'"{c}" = excluded."{c}"' for c in COLUMNS if c != "Buổi")
+        return (
+            f"INSERT INTO runs ({names}, _gen) VALUES ({params}, ?) "
+            f'ON CONFLICT("Buổi") DO UPDATE SET {updates}, _gen = excluded._gen'
+        )
+
+    def import_frame(self, frame, chunk_rows=IMPORT_CHUNK):
+        # lịch sử dạng ghi ra đĩa (cột COLUMNS, pace phút/km, ngày ISO) -> upsert từng khúc,
+        # không dựng một dict cho mỗi dòng của cả bảng như upsert_many(frame.to_dict("records"))
+        sql = self._upsert_sql()
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows].reindex(columns=COLUMNS)
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            with closing(self._connect()) as conn, conn:
+                conn.execute("BEGIN IMMEDIATE")
+                gen = self._bump(conn, "generation")
+                conn.executemany(sql, ((*values, gen) for values in chunk.itertuples(index=False, name=None)))
+
+    def upsert_many(self, rows, expected=None):
+        sql = self._upsert_sql()
+        with closing(self._connect()) as conn, conn:
+            # giữ khoá ghi từ lúc đọc để kiểm tra tới lúc ghi xong; SQLite tự khoá giữa các process
+            conn.execute("BEGIN IMMEDIATE")
+            for buoi, seen in (expected or {}).items():
+                check_expected(self._row(conn, buoi), seen, buoi)
+            gen = self._bump(conn, "generation")
+            conn.executemany(sql, [self._values(r) + [gen] for r in rows])
+
+    def upsert(self, row, expected=UNCHECKED):
+        self.upsert_many([row], None if expected is UNCHECKED else {row["Buổi"]: expected})
+
+    def _query(self, conn, columns, where="", params=()):
+        names = ", ".join(f'"{c}"' for c in columns)
+        return pd.read_sql_query(f'SELECT {names} FROM runs {where} ORDER BY "Buổi"', conn, params=params)
+
+    def load(self, columns=None, where="", params=()):
+        if where:
+            with closing(self._connect()) as conn:
+                return typed(self._query(conn, columns or COLUMNS, where, params))
+        with self._lock:
+            epoch, gen = self.version()
+            if self._frame is None or self._version[0] != epoch:
+                with closing(self._connect()) as conn:
+                    self._frame = typed(self._query(conn, COLUMNS, "WHERE _gen <= ?", (gen,)))
+                self.stats["full"] += 1
+            elif gen > self._version[1]:
+                with closing(self._connect()) as conn:
+                    tail = self._query(conn, COLUMNS, "WHERE _gen > ? AND _gen <= ?", (self._version[1], gen))
+                self._frame = merge_tail(self._frame, tail)
+                self.stats["tail"] += 1
+            else:
+                self.stats["hit"] += 1
+            self._version = (epoch, gen)
+            df = self._frame
+        return snapshot(df, columns)
+
+    def get(self, buoi):
+        df = self.load(where='WHERE "Buổi" = ?', params=(int(buoi),))
+        return None if df.empty else df.iloc[0].to_dict()
+
+    def reset(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM runs")
+            self._bump(conn, "epoch")
+
+
+class MemoryStore:
+    # Store chỉ nằm trong bộ nhớ, dùng cho load test và chạy thử; không ghi gì ra đĩa.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._generation = 0
+        self._frame = typed(empty_frame())
+        self._frame_generation = 0
+        self.stats = {"hit": 0, "tail": 0, "full": 0}
+
+    def version(self):
+        return self._generation
+
+    def upsert_many(self, rows, expected=None):
+        with self._lock:
+            for buoi, seen in (expected or {}).items():
+                check_expected(self._rows.get(buoi), seen, buoi)
+            for row in rows:
+                row = storage_row(row)
+                self._rows[row["Buổi"]] = row
+            self._generation += 1
+
+    def upsert(self, row, expected=UNCHECKED):
+        self.upsert_many([row], None if expected is UNCHECKED else {row["Buổi"]: expected})
+
+    def load(self, columns=None):
+        with self._lock:
+            if self._frame_generation != self._generation:
+                self._frame = typed(pd.DataFrame(list(self._rows.values()), columns=COLUMNS))
+                self._frame_generation = self._generation
+                self.stats["full"] += 1
+            else:
+                self.stats["hit"] += 1
+            df = self._frame
+        return snapshot(df, columns)
+
+    def get(self, buoi):
+        with self._lock:
+            row = self._rows.get(buoi)
+        return None if row is None else dict(row)
+
+    def reset(self):
+        with self._lock:
+            self._rows = {}
+            self._generation += 1
+
+
+# Mỗi vận động viên một thư mục riêng: athletes/<slug>/data.csv, load_state.json, ...
+ATHLETES_DIR = "athletes"
+
+
+def athlete_slug(name):
+    # "Nguyễn Văn Đức" -> "nguyen-van-duc": dùng làm tên thư mục
+    name = unicodedata.normalize("NFKD", name.replace("đ", "d").replace("Đ", "D"))
+    name = "".join(ch for ch in name if not unicodedata.combining(ch)).lower()
+    return re.sub(r"[^a-z0-9]+", "-", name).strip("-")
+
+def list_athletes(root=ATHLETES_DIR):
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+
+def athlete_dir(athlete, root=ATHLETES_DIR):
+    # athlete rỗng: thư mục làm việc, như trước khi có nhiều vận động viên
+    if not athlete:
+        return "."
+    folder = os.path.join(root, athlete_slug(athlete))
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def athlete_path(athlete, filename, root=ATHLETES_DIR):
+    return filename if not athlete else os.path.join(athlete_dir(athlete, root), filename)
+
+
+def open_store(backend=None, athlete=None):
+    # RUNNING_COACH_STORE=sqlite để dùng data.db thay cho data.csv + journal
+    backend = backend or os.environ.get("RUNNING_COACH_STORE", "journal")
+    if backend == "sqlite":
+        return SqliteStore(athlete_path(athlete, "data.db"), legacy_csv=athlete_path(athlete, "data.csv"))
+    if backend == "memory":
+        return MemoryStore()
+    if backend == "journal":
+        return JournalStore(athlete_path(athlete, "data.csv"))
+    raise ValueError(f"Không hỗ trợ kiểu lưu trữ: {backend}")
@@ -0,0 +1,134 @@
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from storage import FileLock, athlete_path
+
+# Mẫu theo giây từ đồng hồ: mỗi kênh một file .npy riêng (theo cột) để đọc bằng memmap,
+# cắt một đoạn của buổi chạy mà không phải đọc cả file. Tên kênh -> (tên file, kiểu lưu).
+CHANNELS = {
+    "Giây": ("t", "int32"),
+    "HR": ("hr", "int16"),
+    "Pace (giây/km)": ("pace", "int16"),
+    "SpO2": ("spo2", "int16"),
+    "Cự ly (m)": ("distance", "float32"),
+}
+
+# kênh số nguyên không có giá trị (đồng hồ mất tín hiệu) lưu bằng -1; kênh số thực dùng NaN
+MISSING = -1
+
+
+def _encode(values, dtype):
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    if dtype.startswith("float"):
+        return values.astype(dtype)
+    info = np.iinfo(dtype)
+    with np.errstate(invalid="ignore"):
+        values = np.round(values)
+        bad = ~((values >= 0) & (values <= info.max))
+    return np.where(bad, MISSING, values).astype(dtype)
+
+
+class StreamStore:
+    # streams/<buổi>/<kênh>.npy, gắn với dòng lịch sử qua số buổi.
+    # Lịch sử tóm tắt (data.csv/data.db) không đọc gì ở đây nên load lịch sử không chậm đi.
+
+    def __init__(self, root="streams"):
+        self.root = root
+        self.file_lock = FileLock(root + ".lock")
+
+    def _dir(self, buoi):
+        return os.path.join(self.root, str(int(buoi)))
+
+    def sessions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(d) for d in os.listdir(self.root) if d.isdigit())
+
+    def version(self, buoi):
+        try:
+            return os.stat(self._dir(buoi)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def save(self, buoi, samples):
+        # samples: {kênh: dãy giá trị}; "Giây" bắt buộc và phải tăng dần để cắt theo thời gian
+        unknown = set(samples) - set(CHANNELS)
+        if unknown:
+            raise ValueError("Kênh không hỗ trợ: " + ", ".join(sorted(unknown)))
+        if "Giây" not in samples:
+            raise ValueError("Thiếu kênh Giây")
+        arrays = {name: _encode(values, CHANNELS[name][1]) for name, values in samples.items()}
+        t = arrays["Giây"]
+        if any(len(a) != len(t) for a in arrays.values()):
+            raise ValueError("Các kênh phải có cùng số mẫu")
+        if (t < 0).any() or (np.diff(t) <= 0).any():
+            raise ValueError("Giây phải tăng dần")
+
+        # ghi cả buổi vào thư mục tạm rồi đổi tên: người đọc thấy bản cũ hoặc bản mới, không lẫn kênh của hai bản
+        os.makedirs(self.root, exist_ok=True)
+        final = self._dir(buoi)
+        tmp = f"{final}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp)
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp, CHANNELS[name][0] + ".npy"), values)
+        with self.file_lock.hold():
+            old = None
+            if os.path.isdir(final):
+                old = tmp + ".old"
+                os.replace(final, old)
+            os.replace(tmp, final)
+        if old:
+            # memmap đang mở vào bản cũ vẫn đọc được sau khi xoá (inode còn tới khi đóng)
+            shutil.rmtree(old, ignore_errors=True)
+        return len(t)
+
+    def load(self, buoi, channels=None):
+        # {kênh: memmap chỉ đọc}; buổi chưa có stream -> None
+        folder = self._dir(buoi)
+        out = {}
+        for name in channels or CHANNELS:
+            path = os.path.join(folder, CHANNELS[name][0] + ".npy")
+            try:
+                out[name] = np.load(path, mmap_mode="r")
+            except FileNotFoundError:
+                if name == "Giây" or not os.path.isdir(folder):
+                    return None
+        return out
+
+    def window(self, buoi, start=None, end=None, channels=None):
+        # các mẫu có start <= Giây < end; chỉ phần được cắt mới được đọc từ đĩa
+        channels = list(channels or CHANNELS)
+        data = self.load(buoi, set(channels) | {"Giây"})
+        if data is None:
+            return None
+        t = data["Giây"]
+        lo = 0 if start is None else int(np.searchsorted(t, start, side="left"))
+        hi = len(t) if end is None else int(np.searchsorted(t, end, side="left"))
+        return {name: np.asarray(data[name][lo:hi]) for name in channels if name in data}
+
+    def frame(self, buoi, start=None, end=None, channels=None):
+        # như window() nhưng trả DataFrame, kênh số nguyên thành Int16/Int32 có NA
+        data = self.window(buoi, start, end, channels)
+        if data is None:
+            return None
+        out = {}
+        for name, values in data.items():
+            dtype = CHANNELS[name][1]
+            out[name] = values if dtype.startswith("float") else pd.arrays.IntegerArray(values, values == MISSING)
+        return pd.DataFrame(out)
+
+    def delete(self, buoi):
+        with self.file_lock.hold():
+            shutil.rmtree(self._dir(buoi), ignore_errors=True)
+
+    def reset(self):
+        with self.file_lock.hold():
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+def open_streams(athlete=None):
+    return StreamStore(athlete_path(athlete, "streams"))
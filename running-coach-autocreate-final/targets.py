@@ -0,0 +1,102 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from plan import sessions
+from training_load import HR_MAX
+
+# Vùng HR theo % HR tối đa
+ZONES = {1: (0.50, 0.60), 2: (0.60, 0.70), 3: (0.70, 0.80), 4: (0.80, 0.90), 5: (0.90, 1.00)}
+
+TARGET_COLUMNS = ["Cự ly từ (m)", "Cự ly đến (m)", "Số lặp", "Cự ly lặp (m)", "Pace từ (giây)", "Pace đến (giây)", "Zone từ", "Zone đến", "HR từ", "HR đến"]
+
+_DASH = r"\s*[–-]\s*"
+_REPS = re.compile(r"(\d+)\s*x\s*(\d+(?:\.\d+)?)\s*(km|m)\b")
+_DISTANCE = re.compile(rf"(\d+(?:\.\d+)?)(?:{_DASH}(\d+(?:\.\d+)?))?\s*(km|m)\b")
+_PACE = re.compile(rf"pace\s+(\d+):(\d{{2}})(?:{_DASH}(\d+):(\d{{2}}))?")
+_ZONE = re.compile(rf"Zone\s*(\d)(?:{_DASH}(\d))?")
+
+
+def _metres(value, unit):
+    return round(float(value) * (1000 if unit == "km" else 1))
+
+def zone_edges(hr_max=HR_MAX):
+    # ranh giới dưới của vùng 1..5 và ranh giới trên của vùng 5 (nhịp/phút)
+    return tuple(round(ZONES[z][0] * hr_max) for z in ZONES) + (round(ZONES[5][1] * hr_max),)
+
+def parse_target(content, zone, hr_max=HR_MAX, hr_edges=None):
+    # "6x800m @ pace 6:30", "Zone 4–5" -> cự ly, số lặp, pace (giây/km), vùng HR; phần không đọc được để trống.
+    # hr_edges: vùng HR riêng của vận động viên (zones.HRProfile.edges()), mặc định theo % hr_max
+    hr_edges = hr_edges or zone_edges(hr_max)
+    target = dict.fromkeys(TARGET_COLUMNS, np.nan)
+    reps = _REPS.search(content)
+    if reps:
+        count, length = int(reps[1]), _metres(reps[2], reps[3])
+        target.update({"Số lặp": count, "Cự ly lặp (m)": length, "Cự ly từ (m)": count * length, "Cự ly đến (m)": count * length})
+    else:
+        distance = _DISTANCE.search(content)
+        if distance:
+            low = _metres(distance[1], distance[3])
+            target.update({"Cự ly từ (m)": low, "Cự ly đến (m)": _metres(distance[2], distance[3]) if distance[2] else low})
+    pace = _PACE.search(content)
+    if pace:
+        low = int(pace[1]) * 60 + int(pace[2])
+        target.update({"Pace từ (giây)": low, "Pace đến (giây)": int(pace[3]) * 60 + int(pace[4]) if pace[3] else low})
+    zones = _ZONE.search(zone)
+    if zones:
+        low, high = int(zones[1]), int(zones[2] or zones[1])
+        target.update({"Zone từ": low, "Zone đến": high, "HR từ": hr_edges[low - 1], "HR đến": hr_edges[high]})
+    return target
+
+
+@lru_cache(maxsize=64)
+def _target_index(plan, hr_edges):
+    return pd.DataFrame(
+        [parse_target(content, zone, hr_edges=hr_edges) for _, content, zone in plan],
+        index=pd.RangeIndex(1, len(plan) + 1, name="Buổi"),
+        columns=TARGET_COLUMNS,
+    )
+
+def target_index(plan=None, hr_edges=None):
+    # Mỗi kế hoạch (và bộ vùng HR) chỉ được phân tích một lần; trả về bản sao nông để người gọi không sửa vào cache
+    plan = sessions if plan is None else plan
+    hr_edges = tuple(hr_edges) if hr_edges else zone_edges()
+    return _target_index(tuple(tuple(s) for s in plan), hr_edges).copy(deep=False)
+
+
+def _deviation(value, low, high):
+    # 0 khi nằm trong khoảng mục tiêu, còn lại là khoảng cách tới biên gần nhất; không có mục tiêu -> NaN
+    with np.errstate(invalid="ignore"):
+        return np.maximum(np.maximum(low - value, value - high), 0.0)
+
+def target_table(index):
+    # Mảng số [pace từ, pace đến, HR từ, HR đến] theo vị trí buổi, thêm một dòng NaN cuối cho buổi ngoài kế hoạch
+    columns = ["Pace từ (giây)", "Pace đến (giây)", "HR từ", "HR đến"]
+    return np.vstack([index[columns].to_numpy(dtype=float), np.full((1, len(columns)), np.nan)])
+
+def type_table(index, types=None):
+    # Khoảng mục tiêu rộng nhất của mỗi loại buổi trong kế hoạch (cùng thứ tự cột với target_table).
+    # types: loại của từng buổi trong index, mặc định theo plan.py
+    types = [s[0] for s in sessions] if types is None else list(types)
+    columns = ["Pace từ (giây)", "Pace đến (giây)", "HR từ", "HR đến"]
+    grouped = index[columns].groupby(pd.Series(types, index=index.index))
+    window = pd.concat([grouped[columns[::2]].min(), grouped[columns[1::2]].max()], axis=1)[columns]
+    return {t: window.loc[t].to_numpy(dtype=float) for t in window.index}
+
+def target_deviations(buoi, pace_seconds, hr, table, fallback=None):
+    # Lệch so với mục tiêu của chính buổi đó, tính cho cả mảng một lần.
+    # Buổi đánh số 1..n liên tục nên tra theo vị trí trong table.
+    # fallback: mục tiêu (n, 4) dùng cho dòng không có số buổi hợp lệ, thường là khoảng chung của loại buổi (type_table)
+    sessions_count = len(table) - 1
+    buoi = np.asarray(buoi, dtype=float)
+    with np.errstate(invalid="ignore"):
+        valid = (buoi >= 1) & (buoi <= sessions_count) & (buoi == np.floor(buoi))
+    targets = table[np.where(valid, np.nan_to_num(buoi) - 1, sessions_count).astype(np.intp)]
+    if fallback is not None:
+        targets = np.where(valid[:, None], targets, fallback)
+    return {
+        "Lệch pace mục tiêu": _deviation(pace_seconds, targets[:, 0], targets[:, 1]),
+        "Lệch HR mục tiêu": _deviation(hr, targets[:, 2], targets[:, 3]),
+    }
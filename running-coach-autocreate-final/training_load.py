@@ -0,0 +1,142 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from storage import atomic_open
+
+HR_REST = 60
+HR_MAX = 190
+
+# Hằng số thời gian (ngày) của tải cấp tính (ATL) và mãn tính (CTL)
+ATL_DAYS = 7
+CTL_DAYS = 42
+
+LOAD_COLUMNS = ["Ngày", "TRIMP", "ATL", "CTL", "TSB"]
+
+
+def trimp(duration, hr, rpe, hr_rest=HR_REST, hr_max=HR_MAX):
+    # TRIMP Banister; không có HR thì ước lượng %HR dự trữ từ RPE
+    if not duration or duration != duration:
+        return 0.0
+    if hr and hr == hr and hr > hr_rest:
+        ratio = (hr - hr_rest) / (hr_max - hr_rest)
+    else:
+        ratio = (rpe or 0) / 10
+    ratio = min(max(ratio, 0.0), 1.0)
+    return duration * ratio * 0.64 * math.exp(1.92 * ratio)
+
+def trimp_array(duration, hr, rpe, hr_rest=HR_REST, hr_max=HR_MAX):
+    duration = np.nan_to_num(np.asarray(duration, dtype=float))
+    hr = np.asarray(hr, dtype=float)
+    rpe = np.nan_to_num(np.asarray(rpe, dtype=float))
+    with np.errstate(invalid="ignore"):
+        ratio = np.where(hr > hr_rest, (hr - hr_rest) / (hr_max - hr_rest), rpe / 10)
+    ratio = np.clip(np.nan_to_num(ratio), 0.0, 1.0)
+    return duration * ratio * 0.64 * np.exp(1.92 * ratio)
+
+def run_loads(df, hr_rest=HR_REST, hr_max=HR_MAX):
+    def col(name):
+        return pd.to_numeric(df[name], errors="coerce") if name in df else pd.Series(np.nan, index=df.index)
+    return pd.Series(
+        trimp_array(col("Thời gian (phút)"), col("HR"), col("RPE"), hr_rest, hr_max),
+        index=df.index,
+    )
+
+
+def compute_load(df, hr_rest=HR_REST, hr_max=HR_MAX):
+    # Tính lại toàn bộ: tổng TRIMP theo ngày rồi EWMA trên chuỗi ngày liên tục
+    days = pd.to_datetime(df["Ngày chạy"], errors="coerce")
+    loads = run_loads(df, hr_rest, hr_max)[days.notna()]
+    days = days[days.notna()].dt.normalize()
+    if days.empty:
+        return pd.DataFrame(columns=LOAD_COLUMNS)
+    daily = loads.groupby(days).sum()
+    daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq="D"), fill_value=0.0)
+    # thêm một ngày 0 ở đầu để EWMA bắt đầu từ 0 như khi cập nhật từng buổi
+    padded = pd.concat([pd.Series([0.0]), pd.Series(daily.to_numpy())], ignore_index=True)
+    atl = padded.ewm(alpha=1 / ATL_DAYS, adjust=False).mean().to_numpy()
+    ctl = padded.ewm(alpha=1 / CTL_DAYS, adjust=False).mean().to_numpy()
+    return pd.DataFrame({
+        "Ngày": daily.index,
+        "TRIMP": daily.to_numpy(),
+        "ATL": atl[1:],
+        "CTL": ctl[1:],
+        "TSB": ctl[:-1] - atl[:-1],
+    })
+
+
+def _decay(value, days, tau):
+    return value * (1 - 1 / tau) ** days
+
+
+class LoadState:
+    # ATL/CTL sau ngày chạy cuối cùng (và của ngày trước đó để tính TSB); thêm một buổi mới là O(1).
+
+    def __init__(self, day=None, atl=0.0, ctl=0.0, prev_atl=0.0, prev_ctl=0.0, runs=0):
+        self.day = day
+        self.atl = atl
+        self.ctl = ctl
+        self.prev_atl = prev_atl
+        self.prev_ctl = prev_ctl
+        self.runs = runs
+
+    @classmethod
+    def from_history(cls, df, hr_rest=HR_REST, hr_max=HR_MAX):
+        series = compute_load(df, hr_rest, hr_max)
+        runs = int(pd.to_datetime(df["Ngày chạy"], errors="coerce").notna().sum())
+        if series.empty:
+            return cls(runs=runs)
+        last = series.iloc[-1]
+        prev = series.iloc[-2] if len(series) > 1 else {"ATL": 0.0, "CTL": 0.0}
+        return cls(
+            day=last["Ngày"].date(),
+            atl=float(last["ATL"]),
+            ctl=float(last["CTL"]),
+            prev_atl=float(prev["ATL"]),
+            prev_ctl=float(prev["CTL"]),
+            runs=runs,
+        )
+
+    def add(self, day, load):
+        # trả về False nếu buổi chạy lùi ngày: khi đó cần tính lại toàn bộ
+        if self.day is not None and day < self.day:
+            return False
+        if self.day is None or day > self.day:
+            gap = 1 if self.day is None else (day - self.day).days
+            self.prev_atl = _decay(self.atl, gap - 1, ATL_DAYS)
+            self.prev_ctl = _decay(self.ctl, gap - 1, CTL_DAYS)
+            self.atl = _decay(self.prev_atl, 1, ATL_DAYS)
+            self.ctl = _decay(self.prev_ctl, 1, CTL_DAYS)
+            self.day = day
+        self.atl += load / ATL_DAYS
+        self.ctl += load / CTL_DAYS
+        self.runs += 1
+        return True
+
+    def at(self, day):
+        # ATL, CTL, TSB tại một ngày sau buổi chạy cuối (không có buổi mới)
+        if self.day is None:
+            return 0.0, 0.0, 0.0
+        gap = max((day - self.day).days, 0)
+        if gap == 0:
+            return self.atl, self.ctl, self.prev_ctl - self.prev_atl
+        atl, ctl = _decay(self.atl, gap, ATL_DAYS), _decay(self.ctl, gap, CTL_DAYS)
+        return atl, ctl, _decay(self.ctl, gap - 1, CTL_DAYS) - _decay(self.atl, gap - 1, ATL_DAYS)
+
+    def save(self, path="load_state.json"):
+        state = dict(vars(self), day=self.day.isoformat() if self.day else None)
+        with atomic_open(path) as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path="load_state.json"):
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state["day"]:
+            state["day"] = pd.Timestamp(state["day"]).date()
+        return cls(**state)
@@ -0,0 +1,106 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from storage import atomic_open
+from targets import target_index, zone_edges
+from training_load import HR_MAX
+
+# Vùng HR theo % HR ngưỡng (LTHR) khi vận động viên đã đo HR ngưỡng; trên 106% vẫn tính là vùng 5
+THRESHOLD_ZONES = {1: (0.70, 0.85), 2: (0.85, 0.90), 3: (0.90, 0.95), 4: (0.95, 1.00), 5: (1.00, 1.06)}
+
+# cột 0 là thời gian dưới vùng 1, cột 1..5 là vùng 1..5
+ZONE_SLOTS = 6
+
+# HR (nhịp/phút) luôn nhỏ hơn mức này: vùng của mọi giá trị HR được tra từ một bảng dựng sẵn
+HR_LIMIT = 256
+
+# khoảng trống giữa hai mẫu dài hơn mức này (dừng đồng hồ, mất tín hiệu) chỉ được tính chừng này giây
+MAX_GAP = 10
+
+
+class HRProfile:
+    # HR tối đa / HR ngưỡng của một vận động viên, lưu ở hr_zones.json trong thư mục của người đó.
+
+    def __init__(self, hr_max=HR_MAX, hr_threshold=None):
+        self.hr_max = hr_max
+        self.hr_threshold = hr_threshold
+
+    def edges(self):
+        if self.hr_threshold:
+            lows = [round(THRESHOLD_ZONES[z][0] * self.hr_threshold) for z in THRESHOLD_ZONES]
+            return tuple(lows) + (round(THRESHOLD_ZONES[5][1] * self.hr_threshold),)
+        return zone_edges(self.hr_max)
+
+    def save(self, path="hr_zones.json"):
+        with atomic_open(path) as f:
+            json.dump({"HR tối đa": self.hr_max, "HR ngưỡng": self.hr_threshold}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path="hr_zones.json"):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        return cls(saved.get("HR tối đa") or HR_MAX, saved.get("HR ngưỡng"))
+
+
+@lru_cache(maxsize=64)
+def _zone_table(edges):
+    # vùng của từng giá trị HR 0..HR_LIMIT-1; ranh giới là số nguyên nên HR lẻ (145.5) cắt phần thập phân vẫn đúng vùng
+    return np.digitize(np.arange(HR_LIMIT), edges[:-1]).astype(np.intp)
+
+def time_in_zones(seconds, hr, edges, lengths=None, max_gap=MAX_GAP):
+    # Số giây ở từng vùng, một lượt NumPy trên cả mảng: diff -> tra vùng -> bincount.
+    # lengths: số mẫu của từng buổi khi nối nhiều buổi vào một mảng (cả mùa) -> kết quả (số buổi, ZONE_SLOTS)
+    seconds = np.asarray(seconds)
+    hr = np.asarray(hr)
+    lengths = np.asarray([len(seconds)] if lengths is None else lengths, dtype=np.int64)
+    dt = np.zeros(len(seconds))
+    np.subtract(seconds[1:], seconds[:-1], out=dt[:-1])
+    np.minimum(dt, max_gap, out=dt)
+    # mẫu cuối mỗi buổi không có khoảng thời gian sau nó; HR mất tín hiệu (-1/NaN) không tính
+    ends = np.cumsum(lengths) - 1
+    dt[ends[lengths > 0]] = 0
+    dt[~(hr > 0)] = 0
+    if hr.dtype.kind == "f":
+        hr = np.nan_to_num(hr)
+    zone = _zone_table(tuple(edges))[np.clip(hr, 0, HR_LIMIT - 1).astype(np.intp)]
+    runs = np.repeat(np.arange(len(lengths)), lengths)
+    by_zone = np.bincount(runs * ZONE_SLOTS + zone, weights=dt, minlength=len(lengths) * ZONE_SLOTS)
+    return by_zone.reshape(len(lengths), ZONE_SLOTS)
+
+
+def percent_in_target(by_zone, low, high):
+    # % thời gian trong vùng mục tiêu [low, high] của từng buổi; buổi không có mục tiêu/không có HR -> NaN
+    low = np.asarray(low, dtype=float)[:, None]
+    high = np.asarray(high, dtype=float)[:, None]
+    inside = (np.arange(ZONE_SLOTS) >= low) & (np.arange(ZONE_SLOTS) <= high)
+    total = by_zone.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where((total > 0) & ~np.isnan(low[:, 0]), 100 * (by_zone * inside).sum(axis=1) / total, np.nan)
+
+
+def zone_percent(samples_list, buois, profile=None, targets=None):
+    # samples_list: các dict kênh theo giây (StreamStore.load hoặc activity.read_activity), cùng thứ tự với buois
+    profile = profile or HRProfile()
+    targets = target_index() if targets is None else targets
+    buois = np.asarray(buois, dtype=int)
+    if not len(buois):
+        return pd.Series(dtype=float, index=pd.Index([], name="Buổi"))
+    lengths = [len(s["Giây"]) if s is not None and "HR" in s else 0 for s in samples_list]
+    present = [s for s, n in zip(samples_list, lengths) if n]
+    seconds = np.concatenate([s["Giây"] for s in present]) if present else np.zeros(0)
+    hr = np.concatenate([s["HR"] for s in present]) if present else np.zeros(0)
+    by_zone = time_in_zones(seconds, hr, profile.edges(), lengths)
+    goal = targets.reindex(buois)
+    return pd.Series(percent_in_target(by_zone, goal["Zone từ"], goal["Zone đến"]), index=pd.Index(buois, name="Buổi"))
+
+
+def season_zone_percent(streams, profile=None, targets=None, buois=None):
+    # % thời gian đúng vùng mục tiêu của mọi buổi có dữ liệu theo giây, tính lại cả mùa một lần
+    buois = streams.sessions() if buois is None else list(buois)
+    return zone_percent([streams.load(b, ["Giây", "HR"]) for b in buois], buois, profile, targets)
@@ -2,7 +2,9 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from datetime import date, timedelta
+from datetime import date
+
+from plan import fixed_schedule, weekly_schedule
 
 st.set_page_config(page_title="Running Coach Tien", layout="centered")
 
@@ -28,31 +30,6 @@ def rate(score):
     elif score >= 60: return "Trung bình"
     else: return "Cần điều chỉnh"
 
-def generate_schedule(start_date):
-    sessions = [
-        ("Tempo", "5–8km @ pace 6:45", "Zone 3–4"),
-        ("Interval", "6x800m @ pace 6:30", "Zone 4–5"),
-        ("Long run", "10km @ pace 7:00–7:30", "Zone 2"),
-        ("Tempo", "6km @ pace 6:40", "Zone 3–4"),
-        ("Interval", "8x400m @ pace 6:20", "Zone 4–5"),
-        ("Long run", "12km @ pace 7:00", "Zone 2"),
-        ("Tempo", "7km @ pace 6:35", "Zone 3–4"),
-        ("Interval", "4x1km @ pace 6:25", "Zone 4–5"),
-        ("Long run", "14km @ pace 6:55", "Zone 2"),
-        ("Tempo", "8km @ pace 6:30", "Zone 3–4"),
-        ("Interval", "10x300m @ pace 6:10", "Zone 4–5"),
-        ("Long run", "16km @ pace 6:50", "Zone 2"),
-        ("Tempo", "9km @ pace 6:25", "Zone 3–4"),
-        ("Interval", "5x1km @ pace 6:20", "Zone 4–5"),
-        ("Long run", "18km @ pace 6:45", "Zone 2"),
-        ("Tempo", "10km @ pace 6:20", "Zone 3–4")
-    ]
-    schedule = []
-    for i, (buoi, noidung, zone) in enumerate(sessions):
-        ngay = start_date + timedelta(days=i * 2)
-        schedule.append({"Ngày": ngay, "Buổi": buoi, "Nội dung": noidung, "Target HR Zone": zone})
-    return pd.DataFrame(schedule)
-
 # Load data
 st.title("🏃‍♂️ Running Coach Tien")
 tab1, tab2, tab3 = st.tabs(["📅 Hôm nay tập gì", "📝 Nhật ký chạy", "📊 Biểu đồ"])
@@ -60,15 +37,22 @@ tab1, tab2, tab3 = st.tabs(["📅 Hôm nay tập gì", "📝 Nhật ký chạy",
 with tab1:
     st.subheader("Thiết lập kế hoạch luyện tập")
     start_day = st.date_input("Chọn ngày bắt đầu kế hoạch luyện tập", value=date.today())
-    schedule_df = generate_schedule(start_day)
-    schedule_df["Ngày"] = pd.to_datetime(schedule_df["Ngày"])
+    plan_kind = st.radio("Kiểu kế hoạch", ["16 buổi cách ngày", "Theo tuần"], horizontal=True)
+    if plan_kind == "Theo tuần":
+        weeks = st.slider("Số tuần", 4, 52, 8)
+        taper_weeks = st.slider("Số tuần giảm tải (taper)", 0, 3, 1)
+        schedule_df = weekly_schedule(start_day, weeks=weeks, taper_weeks=taper_weeks)
+    else:
+        schedule_df = fixed_schedule(start_day)
     today = pd.to_datetime(date.today())
-    today_plan = schedule_df[schedule_df["Ngày"].dt.date == today.date()]
+    today_plan = schedule_df[schedule_df["Ngày"] == today]
     if not today_plan.empty:
         st.success("Buổi tập hôm nay:")
         st.write(today_plan.iloc[0][["Buổi", "Nội dung", "Target HR Zone"]])
     else:
-        st.info("Hôm nay không nằm trong lịch 16 buổi luyện tập.")
+        st.info(f"Hôm nay không nằm trong lịch {len(schedule_df)} buổi luyện tập.")
+    with st.expander("📅 Toàn bộ kế hoạch"):
+        st.dataframe(schedule_df, hide_index=True)
 
 with tab2:
     st.subheader("Nhập kết quả buổi chạy")
@@ -0,0 +1,113 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+SESSIONS_16 = (
+    ("Tempo", "5–8km @ pace 6:45", "Zone 3–4"),
+    ("Interval", "6x800m @ pace 6:30", "Zone 4–5"),
+    ("Long run", "10km @ pace 7:00–7:30", "Zone 2"),
+    ("Tempo", "6km @ pace 6:40", "Zone 3–4"),
+    ("Interval", "8x400m @ pace 6:20", "Zone 4–5"),
+    ("Long run", "12km @ pace 7:00", "Zone 2"),
+    ("Tempo", "7km @ pace 6:35", "Zone 3–4"),
+    ("Interval", "4x1km @ pace 6:25", "Zone 4–5"),
+    ("Long run", "14km @ pace 6:55", "Zone 2"),
+    ("Tempo", "8km @ pace 6:30", "Zone 3–4"),
+    ("Interval", "10x300m @ pace 6:10", "Zone 4–5"),
+    ("Long run", "16km @ pace 6:50", "Zone 2"),
+    ("Tempo", "9km @ pace 6:25", "Zone 3–4"),
+    ("Interval", "5x1km @ pace 6:20", "Zone 4–5"),
+    ("Long run", "18km @ pace 6:45", "Zone 2"),
+    ("Tempo", "10km @ pace 6:20", "Zone 3–4"),
+)
+
+ZONES = {"Tempo": "Zone 3–4", "Interval": "Zone 4–5", "Long run": "Zone 2"}
+
+# (ngày trong tuần, loại buổi); 0 = ngày bắt đầu của tuần
+WEEK_TEMPLATE = ((0, "Tempo"), (2, "Interval"), (5, "Long run"))
+
+# (loại buổi, km tuần đầu, km tăng mỗi tuần, pace tuần đầu (giây/km), pace đổi mỗi tuần)
+# Với Interval, km là tổng quãng chạy nhanh, chia thành các lặp INTERVAL_REP_M mét.
+PROGRESSION = (
+    ("Tempo", 6.0, 1.0, 405, -5),
+    ("Interval", 4.8, 0.4, 390, -5),
+    ("Long run", 10.0, 2.0, 420, -5),
+)
+
+INTERVAL_REP_M = 800
+TAPER_FACTOR = 0.6
+
+SCHEDULE_COLUMNS = ["Ngày", "Buổi", "Nội dung", "Target HR Zone"]
+
+
+def pace_label(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _with_dates(body, start_date, offsets):
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(offsets, unit="D")
+    schedule = body.copy()
+    schedule.insert(0, "Ngày", dates)
+    return schedule
+
+
+@lru_cache(maxsize=16)
+def _fixed_body(sessions):
+    return pd.DataFrame(list(sessions), columns=SCHEDULE_COLUMNS[1:])
+
+
+@lru_cache(maxsize=64)
+def _fixed_schedule(start_date, sessions, every_days):
+    body = _fixed_body(sessions)
+    return _with_dates(body, start_date, np.arange(len(body)) * every_days)
+
+
+def fixed_schedule(start_date, sessions=SESSIONS_16, every_days=2):
+    # Danh sách buổi cố định, cách nhau every_days ngày
+    return _fixed_schedule(start_date, tuple(sessions), every_days).copy(deep=False)
+
+
+@lru_cache(maxsize=16)
+def _weekly_body(template, weeks, progression, taper_weeks):
+    # Phần không phụ thuộc ngày bắt đầu: nội dung từng buổi và độ lệch ngày so với ngày bắt đầu
+    days = np.array([d for d, _ in template])
+    types = np.array([t for _, t in template], dtype=object)
+    params = {p[0]: p[1:] for p in progression}
+    base_km, km_step, base_pace, pace_step = (np.array([params[t][i] for t in types], dtype=float) for i in range(4))
+
+    week = np.arange(weeks)[:, None]
+    build_week = np.minimum(week, max(weeks - taper_weeks - 1, 0))
+    km = base_km + km_step * build_week
+    km = np.where(week >= weeks - taper_weeks, km * TAPER_FACTOR, km)
+    pace = base_pace + pace_step * build_week
+
+    offsets = (week * 7 + days).ravel()
+    types = np.broadcast_to(types, km.shape).ravel()
+    km, pace = km.ravel(), pace.ravel()
+    contents = [
+        f"{max(int(round(k * 1000 / INTERVAL_REP_M)), 1)}x{INTERVAL_REP_M}m @ pace {pace_label(p)}"
+        if t == "Interval" else f"{k:g}km @ pace {pace_label(p)}"
+        for t, k, p in zip(types, np.round(km, 1), pace)
+    ]
+    body = pd.DataFrame({
+        "Buổi": types,
+        "Nội dung": contents,
+        "Target HR Zone": [ZONES.get(t, "") for t in types],
+        "Tuần": np.repeat(np.arange(1, weeks + 1), len(template)),
+        "Khoảng cách (km)": np.round(km, 1),
+        "Pace (giây/km)": pace.astype(int),
+    })
+    return body, offsets
+
+
+@lru_cache(maxsize=64)
+def _weekly_schedule(start_date, weeks, template, progression, taper_weeks):
+    body, offsets = _weekly_body(template, weeks, progression, taper_weeks)
+    return _with_dates(body, start_date, offsets)
+
+
+def weekly_schedule(start_date, weeks=8, template=WEEK_TEMPLATE, progression=PROGRESSION, taper_weeks=1):
+    # Kế hoạch theo mẫu tuần: tăng dần km và pace, các tuần cuối giảm tải (taper)
+    return _weekly_schedule(start_date, weeks, template, progression, taper_weeks).copy(deep=False)
@@ -1,3 +1,4 @@
+import os
 
 import streamlit as st
 import pandas as pd
@@ -6,8 +7,15 @@ from datetime import date
 
 st.set_page_config(page_title="Running Coach - Buổi linh hoạt", layout="centered")
 
-@st.cache_data
-def load_data():
+def data_version():
+    if not os.path.exists("data.csv"):
+        return None
+    stat = os.stat("data.csv")
+    return (stat.st_mtime_ns, stat.st_size)
+
+# cache_resource trả về cùng một DataFrame (không chép lại mỗi lần gọi); đổi file thì version đổi
+@st.cache_resource(max_entries=2)
+def load_data(version):
     try:
         df = pd.read_csv("data.csv")
     except:
@@ -49,9 +57,11 @@ sessions = [
 st.title("🏃‍♂️ Running Coach – Linh hoạt theo buổi")
 tab1, tab2, tab3 = st.tabs(["📋 Buổi kế tiếp", "📝 Ghi kết quả", "📊 Biểu đồ"])
 
+# Một snapshot dùng chung cho mọi tab trong lần chạy này
+df = load_data(data_version())
+current_session = len(df) + 1
+
 with tab1:
-    df = load_data()
-    current_session = len(df) + 1
     if current_session <= 16:
         st.success(f"🎯 Buổi kế tiếp: Buổi #{current_session}")
         buoi, noidung, zone = sessions[current_session - 1]
@@ -63,8 +73,6 @@ with tab1:
 
 with tab2:
     st.subheader("Nhập kết quả buổi chạy")
-    df = load_data()
-    current_session = len(df) + 1
     if current_session > 16:
         st.warning("Bạn đã hoàn thành tất cả các buổi!")
     else:
@@ -97,7 +105,6 @@ with tab2:
         st.dataframe(df.sort_values("Buổi"))
 
 with tab3:
-    df = load_data()
     if not df.empty:
         fig, ax = plt.subplots()
         ax.plot(df["Buổi"], df["Tổng điểm"], marker="o", linestyle="--")